@@ -0,0 +1,188 @@
+import collections
+import concurrent.futures
+import os
+import time
+
+import main
+
+# Outcome of one tour problem of a batch: the start square, whether a tour
+# was found, the seconds spent on it, and the tour itself if requested.
+StartResult = collections.namedtuple('StartResult', ['start', 'found', 'seconds', 'board'])
+
+# Outcome of one board size of a multi-size batch.
+SizeResult = collections.namedtuple('SizeResult', ['n', 'm', 'found', 'seconds', 'board'])
+
+
+def warm(n, m):
+    """
+    Builds the adjacency table of an n x m board in a worker process.
+
+    Used as the pool initializer, so each worker builds the read-only table
+    once instead of once per task. Workers forked from a parent that already
+    built it simply inherit it.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+    """
+    main.adjacency(n, m)
+
+
+def solve_start(n, m, start, boards, options):
+    """
+    Solves one start square of a batch, inside a worker process.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        start (tuple): (x, y) square the knight starts from.
+        boards (bool): Whether to send the tour back, packed.
+        options (dict): Keyword arguments for `main.tour`.
+
+    Returns:
+        tuple: The start square, whether a tour was found, the seconds it
+        took, and the packed tour (see `main.pack`) or None.
+    """
+    began = time.perf_counter()
+    board = main.tour(n, m, start, cache=None, **options)
+    seconds = time.perf_counter() - began
+    packed = main.pack(board) if boards and board is not None else None
+    return start, board is not None, seconds, packed
+
+
+def all_starts(n, m=None, workers=None, boards=False, symmetric=True, **options):
+    """
+    Solves an n x m board from every start square, in parallel.
+
+    Start squares are fanned out over a pool of worker processes, and the
+    results are yielded as soon as each one completes, not in board order.
+    With `symmetric`, only one start square per class of squares related by
+    a board symmetry is solved first (see `main.canonical`), and its tour
+    is mapped onto the whole class, which cuts the work up to 8x on square
+    boards. Engines do not always behave the same on symmetric problems, so
+    when the representative fails, the other squares of its class are
+    solved on their own. Boards whose edges wrap or with blocked squares
+    are always solved from every square, blocked squares excepted.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        workers (int): Number of worker processes. Defaults to the number
+            of CPUs.
+        boards (bool): Whether to include each tour in its result.
+        symmetric (bool): Whether to solve only one start square per
+            symmetry class.
+        **options: Further keyword arguments for `main.tour`, such as
+            `engine`, `tiebreak` or `max_nodes`.
+
+    Yields:
+        StartResult: The outcome for one start square.
+    """
+    if m is None:
+        m = n
+    if options.get('topology', 'plane') != 'plane':
+        symmetric = False  # Transposing a cylinder swaps the axis that wraps
+    blocked = set(options.get('blocked') or ())
+    if blocked:
+        symmetric = False  # Symmetric squares of a masked board are not alike
+    classes = collections.defaultdict(list)  # Representative start -> (start, symmetry)
+    cn, cm = n, m
+    for x in range(n):
+        for y in range(m):
+            if (x, y) in blocked:
+                continue
+            sym, cstart = (False, False, False), (x, y)
+            if symmetric:
+                sym, cn, cm, cstart = main.canonical(n, m, (x, y))
+            classes[cstart].append(((x, y), sym))
+
+    main.adjacency(cn, cm)  # Inherited by forked workers
+    with concurrent.futures.ProcessPoolExecutor(
+            max_workers=workers or os.cpu_count(), initializer=warm, initargs=(cn, cm)) as pool:
+        # Future -> the class it solves, or None for a square solved on its own
+        pending = {pool.submit(solve_start, cn, cm, cstart, boards, options): cstart
+                   for cstart in classes}
+        while pending:
+            done, _ = concurrent.futures.wait(
+                pending, return_when=concurrent.futures.FIRST_COMPLETED)
+            for future in done:
+                cstart = pending.pop(future)
+                start, found, seconds, packed = future.result()
+                board = None if packed is None else main.unpack(*packed)
+                if cstart is None:
+                    yield StartResult(start, found, seconds, board)
+                    continue
+                for start, sym in classes[cstart]:
+                    if not found and any(sym):
+                        # Greedy engines can fail from one square of a class
+                        # and succeed from another, so solve it as is
+                        pending[pool.submit(solve_start, n, m, start, boards, options)] = None
+                    elif board is None:
+                        yield StartResult(start, found, seconds, None)
+                    else:
+                        yield StartResult(start, found, seconds,
+                                          main.transform(board, cn, cm, main.inverse(sym)))
+
+
+def solve_size(n, m, start, boards, options):
+    """
+    Solves one board size of a batch, inside a worker process.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        start (tuple): (x, y) square the knight starts from.
+        boards (bool): Whether to send the tour back, packed.
+        options (dict): Keyword arguments for `main.tour`.
+
+    Returns:
+        SizeResult: The outcome for the size, with the tour packed (see
+        `main.pack`) or None.
+    """
+    began = time.perf_counter()
+    board = main.tour(n, m, start, cache=None, **options)
+    seconds = time.perf_counter() - began
+    packed = main.pack(board) if boards and board is not None else None
+    return SizeResult(n, m, board is not None, seconds, packed)
+
+
+def all_sizes(sizes, start=(0, 0), workers=None, boards=False, **options):
+    """
+    Solves a batch of board sizes, in parallel.
+
+    The cost of a size grows with its number of squares, so sizes are
+    submitted largest first, one task each. Idle workers pull the next task
+    from the pool's shared queue as soon as they finish one, so no worker
+    sits on a pre-assigned chunk while others are busy, and the small sizes
+    at the end fill in the gaps left by the large ones. Results are yielded
+    as each size completes.
+
+    Args:
+        sizes (iterable): Board sizes, either ints for square boards or
+            (n, m) pairs.
+        start (tuple): (x, y) square the knight starts from on every board.
+        workers (int): Number of worker processes. Defaults to the number
+            of CPUs.
+        boards (bool): Whether to include each tour in its result.
+        **options: Further keyword arguments for `main.tour`, such as
+            `engine` or `tiebreak`.
+
+    Yields:
+        SizeResult: The outcome for one board size.
+    """
+    shapes = {(size, size) if isinstance(size, int) else tuple(size) for size in sizes}
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as pool:
+        futures = [
+            pool.submit(solve_size, n, m, start, boards, options)
+            for n, m in sorted(shapes, key=lambda shape: shape[0] * shape[1], reverse=True)
+        ]
+        for future in concurrent.futures.as_completed(futures):
+            result = future.result()
+            if result.board is not None:
+                result = result._replace(board=main.unpack(*result.board))
+            yield result
+
+
+if __name__ == "__main__":
+    for result in all_starts(main.N):
+        print(f"{result.start}: {'found' if result.found else 'failed'} in {result.seconds:.4f}s")
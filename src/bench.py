@@ -0,0 +1,43 @@
+import os
+import sys
+import tempfile
+import time
+
+import main
+
+
+def throughput(n=1000, m=None, repeat=3):
+    """
+    Measures how fast each board writer writes an n x m tour to disk.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        repeat (int): Number of runs per writer; the fastest one counts.
+
+    Returns:
+        dict: (seconds, megabytes per second) of each format of
+        `main.WRITERS`, under its first name.
+    """
+    if m is None:
+        m = n
+    board = main.tour(n, m, engine='blocks', cache=None)
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for format, writer in main.WRITERS.items():
+            if writer in (main.WRITERS[name] for name in results):
+                continue
+            path = os.path.join(directory, f'tour.{format}')
+            best = float('inf')
+            for _ in range(repeat):
+                began = time.perf_counter()
+                main.save(board, m, path, format)
+                best = min(best, time.perf_counter() - began)
+            results[format] = (best, os.path.getsize(path) / best / 1e6)
+    return results
+
+
+if __name__ == "__main__":
+    n = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    for format, (seconds, rate) in throughput(n).items():
+        print(f"{format:5} {seconds:8.3f}s {rate:8.1f} MB/s")
@@ -1,15 +1,348 @@
+import collections
 import functools
+import io
+import itertools
+import mmap
+import os
+import random
+import re
+import struct
+import sys
+import tempfile
+import threading
 import time
+from array import array
+
+try:
+    import numpy
+except ImportError:  # The NumPy engine falls back to the pure-Python one
+    numpy = None
 
 N = 8
 
 MX = [1, 2, 2, 1, -1, -2, -2, -1]
 MY = [-2, -1, 1, 2, 2, 1, -1, -2]
 
+# Added to the degree of a visited square so it never wins a degree comparison.
+VISITED = 128
+
+# Board cell of a square cut out of the board, which no tour visits.
+BLOCKED = -2
+
+
+def leaper(a, b):
+    """
+    Builds the moves of an (a, b)-leaper.
+
+    A leaper jumps a squares one way and b squares the other, in any of the
+    eight directions: the knight is the (1, 2)-leaper, the camel (1, 3), the
+    zebra (2, 3). Moves come in the same turning order as `MX`/`MY`, so
+    `leaper(1, 2)` lists the knight moves exactly as they are, and moves
+    that coincide, as for (0, b) or (a, a), are kept once.
+
+    Args:
+        a (int): Length of one leg of the jump.
+        b (int): Length of the other leg.
+
+    Returns:
+        tuple: The (dx, dy) of each move.
+    """
+    moves = [(a, -b), (b, -a), (b, a), (a, b), (-a, b), (-b, a), (-b, -a), (-a, -b)]
+    return tuple(dict.fromkeys(moves))
+
+
+def compound(*pieces):
+    """
+    Builds a piece moving like any of the given ones, such as the wizard,
+    which moves like a ferz (1, 1) or a camel (1, 3).
+
+    Args:
+        *pieces (tuple): The moves of each piece, see `leaper`.
+
+    Returns:
+        tuple: The (dx, dy) of each move, those of the first piece first.
+    """
+    return tuple(dict.fromkeys(move for piece in pieces for move in piece))
+
+
+KNIGHT = leaper(1, 2)
+
+# Pieces selectable through `tour(piece=...)`, by name.
+PIECES = {
+    'knight': KNIGHT,
+    'camel': leaper(1, 3),
+    'zebra': leaper(2, 3),
+    'giraffe': leaper(1, 4),
+    'wizard': compound(leaper(1, 1), leaper(1, 3)),
+}
+
+
+# Board topologies selectable through `tour(topology=...)`, by name: whether
+# moves wrap around from the last row to the first, and from the last
+# column to the first.
+TOPOLOGIES = {
+    'plane': (False, False),
+    'cylinder': (False, True),
+    'torus': (True, True),
+}
+
+
+@functools.lru_cache(maxsize=16)
+def adjacency(n, m, piece=KNIGHT, blocked=frozenset(), topology='plane'):
+    """
+    Builds the move adjacency table of an n x m board.
+
+    Squares are numbered row by row, so (x, y) becomes the flat index
+    x * m + y. Entry i of the table holds the flat indices of every square
+    the piece (a knight by default) can reach from square i without leaving
+    the board, in the order of its moves. The table is built once per board
+    size and piece and cached, which lets the hot loops skip coordinate
+    arithmetic and bounds checks entirely. Squares cut out of the board are
+    left out of the table the same way, so the hot loops never see them
+    either.
+
+    On a cylinder or torus (see `TOPOLOGIES`), moves off an edge come back
+    in on the opposite edge. The wrapping is worked out here once, so the
+    hot loops stay free of modulo arithmetic. On boards narrower than a jump,
+    moves that wrap onto the same square are listed once, and moves that
+    wrap back onto their start are dropped.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+        blocked (frozenset): Flat indices of the squares cut out of the board.
+        topology (str): How the edges of the board connect, a key of
+            `TOPOLOGIES`.
+
+    Returns:
+        tuple: One tuple of neighbor indices per square, empty for blocked
+        squares.
+    """
+    wrap_x, wrap_y = TOPOLOGIES[topology]
+    table = []
+    for x in range(n):
+        for y in range(m):
+            targets = {}
+            if x * m + y not in blocked:
+                for dx, dy in piece:
+                    tx, ty = x + dx, y + dy
+                    if wrap_x:
+                        tx %= n
+                    if wrap_y:
+                        ty %= m
+                    nb = tx * m + ty
+                    if 0 <= tx < n and 0 <= ty < m and nb != x * m + y and nb not in blocked:
+                        targets[nb] = None
+            table.append(tuple(targets))
+    return tuple(table)
+
+
+@functools.lru_cache(maxsize=16)
+def attacks(n, m, piece=KNIGHT, blocked=frozenset(), topology='plane'):
+    """
+    Builds the attack bitboards of an n x m board.
+
+    The mask of a square has bit `nb` set for each square `nb` one move
+    away, so the unvisited neighbors of a square are `mask & free` for a
+    bitboard `free` of unvisited squares. Up to 8 x 8 a mask fits in one
+    64-bit word. Larger boards get masks as wide as the whole board, so
+    building them takes time and memory growing with the square of the area
+    (about a second and 20 MB at 120 x 120): the tables are meant for small
+    boards.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+        blocked (frozenset): Flat indices of the squares cut out of the board.
+        topology (str): How the edges of the board connect, a key of
+            `TOPOLOGIES`.
+
+    Returns:
+        tuple: The attack mask of each flat square index.
+    """
+    return tuple(sum(1 << nb for nb in nbs) for nbs in adjacency(n, m, piece, blocked, topology))
+
+
+# Move graph of a board in compressed sparse row form: the neighbors of square
+# `sq` are `neighbors[offsets[sq]:offsets[sq + 1]]`.
+Graph = collections.namedtuple('Graph', ['offsets', 'neighbors'])
+
+
+@functools.lru_cache(maxsize=16)
+def csr(n, m, piece=KNIGHT, blocked=frozenset(), topology='plane'):
+    """
+    Builds the move graph of an n x m board in compressed sparse row form.
+
+    The graph holds the same moves as `adjacency`, in the same order, in
+    two flat int arrays instead of one tuple per square, so it takes a few
+    bytes per move and can be handed as is to graph code outside Python.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+        blocked (frozenset): Flat indices of the squares cut out of the board.
+        topology (str): How the edges of the board connect, a key of
+            `TOPOLOGIES`.
+
+    Returns:
+        Graph: The offsets (one per square, plus the total) and neighbors
+        arrays of the board.
+    """
+    offsets = array('i', [0])
+    neighbors = array('i')
+    for nbs in adjacency(n, m, piece, blocked, topology):
+        neighbors.extend(nbs)
+        offsets.append(len(neighbors))
+    return Graph(offsets, neighbors)
+
+
+# Move structure of the padded board used by `kt_compact`: the board sits
+# inside a border as wide as the longest jump, so a move is a fixed index
+# offset.
+Padded = collections.namedtuple('Padded', ['n', 'm', 'offsets', 'border'])
+
+
+@functools.lru_cache(maxsize=16)
+def padding(n, m, piece=KNIGHT):
+    """
+    Builds the padded-board move structure of an n x m board.
+
+    The board is laid out row by row inside a border as wide as the piece
+    can jump off the edge, two squares for a knight. Every move then turns
+    into adding a constant offset to the padded index, and off-board targets
+    land on border cells, so no adjacency table has to be stored.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+
+    Returns:
+        Padded: The board dimensions, the index offset of each move, and the
+        width of the border.
+    """
+    border = max(max(abs(dx), abs(dy)) for dx, dy in piece)
+    width = m + 2 * border
+    return Padded(n, m, tuple(dx * width + dy for dx, dy in piece), border)
+
+
+def hyperleaper(a, b, dims):
+    """
+    Builds the moves of an (a, b)-leaper on a board with `dims` dimensions.
+
+    The piece jumps a squares along one axis and b along another, leaving
+    the other coordinates alone, so the 3D knight, `hyperleaper(1, 2, 3)`,
+    has 24 moves. Moves are listed axis pair by axis pair, which in two
+    dimensions is not the `MX`/`MY` order.
+
+    Args:
+        a (int): Length of one leg of the jump.
+        b (int): Length of the other leg.
+        dims (int): Number of dimensions of the board.
+
+    Returns:
+        tuple: The move of each jump, as a tuple of one step per axis.
+    """
+    moves = []
+    for i in range(dims):
+        for j in range(dims):
+            if i != j:
+                for sa, sb in ((1, -1), (1, 1), (-1, 1), (-1, -1)):
+                    move = [0] * dims
+                    move[i] += sa * a
+                    move[j] += sb * b
+                    moves.append(tuple(move))
+    return tuple(dict.fromkeys(moves))
+
+
+# Move structure of a padded board of any dimension, used by `kt_lattice`:
+# the side lengths, the index offset of each move, the width of the border,
+# the index step of each axis on the padded board, and the flat index of each
+# padded cell (-1 on the border).
+Lattice = collections.namedtuple('Lattice', ['shape', 'offsets', 'border', 'strides', 'squares'])
+
+
+def padded_rows(shape, border, strides):
+    """
+    Lists the rows of a padded board of any dimension.
+
+    A row runs along the last axis, so it is contiguous both on the board
+    and on the padded board, and can be filled with one slice assignment.
+
+    Args:
+        shape (tuple): Side length of the board along each axis.
+        border (int): Width of the border around the board.
+        strides (tuple): Index step of each axis on the padded board.
+
+    Yields:
+        tuple: The coordinates of the row on all axes but the last, and the
+        padded index of its first square.
+    """
+    for coords in itertools.product(*map(range, shape[:-1])):
+        yield coords, sum((c + border) * stride for c, stride in zip(coords, strides)) + border
+
+
+@functools.lru_cache(maxsize=4)
+def lattice(shape, piece):
+    """
+    Builds the padded move structure of a board of any dimension.
+
+    This is `padding` for boards with more than two axes: the board is laid
+    out row by row inside a border as wide as the longest jump, so every
+    move is a constant index offset and moves off the board land on border
+    cells. A table from padded to flat indices stands in for the divmod that
+    `kt_compact` does on every move.
+
+    Args:
+        shape (tuple): Side length of the board along each axis.
+        piece (tuple): The moves of the piece, see `hyperleaper`.
+
+    Returns:
+        Lattice: The padded move structure of the board.
+    """
+    border = max(max(map(abs, move)) for move in piece)
+    strides = [1]
+    for side in reversed(shape[1:]):
+        strides.insert(0, strides[0] * (side + 2 * border))
+    strides = tuple(strides)
+    offsets = tuple(sum(d * stride for d, stride in zip(move, strides)) for move in piece)
+    squares = array('i', [-1]) * (strides[0] * (shape[0] + 2 * border))
+    length = shape[-1]
+    for i, (_, start) in enumerate(padded_rows(shape, border, strides)):
+        squares[start:start + length] = array('i', range(i * length, (i + 1) * length))
+    return Lattice(shape, offsets, border, strides, squares)
+
+
+@functools.lru_cache(maxsize=4)
+def lattice_adjacency(shape, piece):
+    """
+    Builds the move adjacency table of a board of any dimension.
+
+    The table is the same as the one of `adjacency` for two dimensions, so
+    the engines working from an adjacency table run on it unchanged. It
+    takes far more memory than `lattice` on large boards.
+
+    Args:
+        shape (tuple): Side length of the board along each axis.
+        piece (tuple): The moves of the piece, see `hyperleaper`.
+
+    Returns:
+        tuple: One tuple of neighbor indices per flat square.
+    """
+    _, offsets, border, strides, squares = lattice(shape, piece)
+    table = []
+    for _, start in padded_rows(shape, border, strides):
+        for p in range(start, start + shape[-1]):
+            table.append(tuple(squares[p + off] for off in offsets if squares[p + off] >= 0))
+    return tuple(table)
 
-def degree(x, y, board):
+
+def degree(sq, board, adj):
     """
-    Counts how many valid moves can be made from the current knight's position (x, y).
+    Counts how many valid moves can be made from the knight's square `sq`.
 
     A valid move is one where the knight moves to an unvisited square within
     the board's boundaries. The count represents how many onward moves are
@@ -17,121 +350,2711 @@ def degree(x, y, board):
     based on Warnsdorff's rule (which favors positions with fewer onward moves).
 
     Args:
-        x (int): Current x-coordinate of the knight.
-        y (int): Current y-coordinate of the knight.
+        sq (int): Flat index of the knight's square.
         board (list): The current board configuration showing visited cells.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
 
     Returns:
-        int: Number of valid moves from (x, y).
+        int: Number of valid moves from `sq`.
     """
     count = 0
-    for i in range(8):
-        nx, ny = x + MX[i], y + MY[i]
-        if check(nx, ny, board):
+    for nb in adj[sq]:
+        if check(nb, board):
             count += 1
     return count
 
 
-def check(x, y, board):
+def check(sq, board):
     """
-    Checks whether the knight's move to (x, y) is valid.
+    Checks whether the knight's move to square `sq` is valid.
 
-    A move is valid if the target square (x, y) is within the board's limits
-    and has not been visited yet.
+    A move is valid if the target square has not been visited yet. Squares
+    outside the board's limits or cut out of it never show up in the
+    adjacency table, so no bounds check is needed here.
 
     Args:
-        x (int): Target x-coordinate for the knight.
-        y (int): Target y-coordinate for the knight.
+        sq (int): Flat index of the target square.
         board (list): The current board configuration.
 
     Returns:
         bool: True if the move is valid, False otherwise.
     """
-    return 0 <= x < N and 0 <= y < N and board[x][y] == -1
+    return board[sq] == -1
 
 
-@functools.cache
-def solve():
+def pohl(n, m, adj):
     """
-    Solves the Knight's Tour problem using Warnsdorff's heuristic.
+    Builds Pohl's tie-break rule for an n x m board.
 
-    The goal is to move a knight on a chessboard such that it visits every
-    square exactly once. Warnsdorff's heuristic helps guide the knight's moves
-    by always selecting the next square that has the fewest onward moves.
+    Among moves with the same onward degree, Pohl's rule looks one level
+    further and prefers the square whose own onward squares have the smallest
+    total degree.
 
-    The function starts at position (0, 0) and attempts to find a tour. If
-    successful, it prints the solution; otherwise, it indicates that no solution
-    was found.
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
 
     Returns:
-        bool: True if a solution was found, False otherwise.
+        function: rank(sq, nb, deg), lower ranks are preferred.
     """
-    board = [[-1 for _ in range(N)] for _ in range(N)]  # Initialize the board
-    board[0][0] = 0  # Start knight at position (0, 0)
+    def rank(sq, nb, deg):
+        total = 0
+        for nnb in adj[nb]:
+            d = deg[nnb]
+            if d < VISITED:
+                total += d
+        return total
 
-    if not kt(board, 0, 0, 1):
-        return False
-    else:
-        display(board)
-        return True
+    return rank
 
 
-def kt(board, x, y, pos):
+def roth(n, m, adj):
     """
-    Recursively attempts to solve the Knight's Tour problem using Warnsdorff's rule.
+    Builds Arnd Roth's tie-break rule for an n x m board.
 
-    This function tries to move the knight to all possible positions, choosing
-    the one with the least onward moves first. If it reaches a dead-end, it
-    backtracks and tries a different path.
+    Among moves with the same onward degree, Roth's rule prefers the square
+    farthest (in Euclidean distance) from the center of the board, which
+    keeps the knight near the edges and leaves the well-connected middle for
+    last.
 
     Args:
-        board (list): The current state of the board.
-        x (int): Current x-coordinate of the knight.
-        y (int): Current y-coordinate of the knight.
-        pos (int): The number of the current move (starting from 1).
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
 
     Returns:
-        bool: True if the knight successfully completes the tour, False otherwise.
+        function: rank(sq, nb, deg), lower ranks are preferred.
     """
-    if pos == N * N:
-        return True
+    far = [-((2 * x - n + 1) ** 2 + (2 * y - m + 1) ** 2) for x in range(n) for y in range(m)]
 
-    idx = -1
-    temp = N + 1
-    nnx, nny = -1, -1
+    def rank(sq, nb, deg):
+        return far[nb]
 
-    for i in range(8):
-        nx, ny = x + MX[i], y + MY[i]
-        if check(nx, ny, board):
-            deg = degree(nx, ny, board)
-            if deg < temp:
-                temp = deg
-                idx = i
-                nnx, nny = nx, ny
+    return rank
 
-    if idx == -1:  # No valid move found (dead-end)
-        return False
 
-    board[nnx][nny] = pos
+def move_order(*order, piece=KNIGHT):
+    """
+    Builds a tie-break rule from a fixed ordering of the knight moves.
 
-    if kt(board, nnx, nny, pos + 1):
-        return True
+    This is the scheme of Squirrel and Cull: among moves with the same onward
+    degree, the one coming first in a chosen move ordering wins. Moves are
+    numbered from 1 in the order of the piece's moves, `MX`/`MY` order for
+    the knight, so `move_order(1, 2, 3, 4, 5, 6, 7, 8)` is the same as the
+    default 'first' rule. The rule only ranks the moves of `piece`, and
+    `tour` refuses it for another piece.
 
-    board[nnx][nny] = -1
-    return False
+    Args:
+        *order (int): The move numbers, most preferred first.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+
+    Returns:
+        function: A tie-break rule for `tour(tiebreak=...)`.
+    """
+    if sorted(order) != list(range(1, len(piece) + 1)):
+        raise ValueError(f"move order must be a permutation of 1..{len(piece)}, got {order!r}")
+
+    def strategy(n, m, adj):
+        ranks = {piece[k - 1]: i for i, k in enumerate(order)}
+        wrapped = {}  # Moves across the edge of a cylinder or torus
+        for (dx, dy), i in ranks.items():
+            wrapped.setdefault((dx % n, dy % m), i)
+
+        def rank(sq, nb, deg):
+            move = (nb // m - sq // m, nb % m - sq % m)
+            return ranks[move] if move in ranks else wrapped[move[0] % n, move[1] % m]
+
+        return rank
+
+    strategy.piece = piece  # Checked by `tour` against the piece it tours
+    return strategy
+
+
+def randomized(seed=None):
+    """
+    Builds a tie-break rule that decides between moves of equal degree at random.
+
+    Random tie-breaking is what makes restarting a bounded search worthwhile:
+    each attempt explores a different part of the search space instead of
+    getting stuck in the same hopeless subtree again.
+
+    Args:
+        seed: Seed of the random generator, for reproducible tours.
+
+    Returns:
+        function: A tie-break rule for `tour(tiebreak=...)`.
+    """
+    rng = random.Random(seed)
+
+    def strategy(n, m, adj):
+        def rank(sq, nb, deg):
+            return rng.random()
+
+        return rank
+
+    return strategy
+
+
+# Tie-break rules selectable through `tour(tiebreak=...)`, by name.
+TIEBREAKS = {
+    'first': None,
+    'pohl': pohl,
+    'roth': roth,
+}
+
+
+def transform_square(n, m, x, y, sym):
+    """
+    Maps square (x, y) of an n x m board through a board symmetry.
+
+    A symmetry (transpose, flip_x, flip_y) first mirrors the rows and/or the
+    columns, then optionally transposes the board, which turns an n x m
+    board into an m x n one. The eight combinations make up the symmetries
+    of a square board, and relate each rectangle to its transpose.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        x (int): Row of the square.
+        y (int): Column of the square.
+        sym (tuple): The (transpose, flip_x, flip_y) flags.
+
+    Returns:
+        tuple: The image board size and square, (n, m, x, y).
+    """
+    transpose, flip_x, flip_y = sym
+    if flip_x:
+        x = n - 1 - x
+    if flip_y:
+        y = m - 1 - y
+    return (m, n, y, x) if transpose else (n, m, x, y)
+
+
+def inverse(sym):
+    """
+    Inverts a board symmetry of `transform_square`.
+
+    Args:
+        sym (tuple): The (transpose, flip_x, flip_y) flags.
+
+    Returns:
+        tuple: The flags undoing `sym`.
+    """
+    transpose, flip_x, flip_y = sym
+    return (transpose, flip_y, flip_x) if transpose else sym
+
+
+def transform(board, n, m, sym):
+    """
+    Maps a whole move-order board through a board symmetry.
+
+    The rows and columns are moved with slice copies, so this runs at memory
+    speed even for huge boards.
+
+    Args:
+        board (array): The flat move-order board of an n x m tour.
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        sym (tuple): The (transpose, flip_x, flip_y) flags.
+
+    Returns:
+        array: The flat move-order board of the image tour.
+    """
+    transpose, flip_x, flip_y = sym
+    rows = [board[x * m:(x + 1) * m] for x in range(n)]
+    if flip_x:
+        rows.reverse()
+    if flip_y:
+        rows = [row[::-1] for row in rows]
+    out = array('i', [0]) * (n * m)
+    for x, row in enumerate(rows):
+        if transpose:
+            out[x::n] = row
+        else:
+            out[x * m:(x + 1) * m] = row
+    return out
+
+
+def canonical(n, m, start):
+    """
+    Picks the representative of a tour problem under the board symmetries.
+
+    Problems related by a symmetry share their tours, mapped square by
+    square, so a cache only has to solve the representative: the image with
+    the fewest rows and then the smallest start square. On a square board
+    this folds the eight symmetric start squares into one.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        start (tuple): (x, y) start square, or None for a closed tour, which
+            can start anywhere.
+
+    Returns:
+        tuple: The symmetry to apply and the representative (n, m, start).
+    """
+    best = None
+    for sym in itertools.product((False, True), repeat=3):
+        if start is None:
+            image = (m, n, None) if sym[0] else (n, m, None)
+        else:
+            cn, cm, cx, cy = transform_square(n, m, *start, sym)
+            image = (cn, cm, (cx, cy))
+        if best is None or image < best[1:]:
+            best = (sym,) + image
+    return best
+
+
+def cache_key(n, m, start, closed, engine, tiebreak, piece):
+    """
+    Builds the key a tour request is cached under.
+
+    Requests related by a board symmetry share one key (see `canonical`),
+    and the tour cached under it is stored in the orientation of the key.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        start (tuple): (x, y) start square.
+        closed (bool): Whether the tour is closed.
+        engine (str): Name of the tour engine.
+        tiebreak (str): Name of the tie-break rule.
+        piece (str): Name of the piece.
+
+    Returns:
+        tuple: The symmetry mapping the request's board onto the cached one,
+        and the key.
+    """
+    sym, cn, cm, cstart = canonical(n, m, None if closed else start)
+    return sym, (cn, cm, cstart, closed, engine, tiebreak, piece)
+
+
+def pack(board):
+    """
+    Encodes a move-order board in the narrowest array type for its moves.
+
+    Args:
+        board (array): The flat move-order board of a tour.
+
+    Returns:
+        tuple: The array typecode ('B', 'H' or 'i') and the little-endian
+        bytes of the board in that type.
+    """
+    typecode = 'B' if len(board) <= 2 ** 8 else 'H' if len(board) <= 2 ** 16 else 'i'
+    if min(board) < 0:  # Blocked squares of a masked board
+        typecode = 'i'
+    narrow = array(typecode, board)
+    if sys.byteorder == 'big':
+        narrow.byteswap()
+    return typecode, narrow.tobytes()
+
+
+def unpack(typecode, data):
+    """
+    Decodes a move-order board encoded by `pack`.
+
+    Args:
+        typecode (str): The array typecode of the encoded board.
+        data (bytes): The little-endian bytes of the board.
+
+    Returns:
+        array: The flat move-order board as an array('i').
+    """
+    narrow = array(typecode)
+    narrow.frombytes(data)
+    if sys.byteorder == 'big':
+        narrow.byteswap()
+    return narrow if typecode == 'i' else array('i', narrow)
+
+
+class TourCache:
+    """
+    Least-recently-used cache of finished tours, keyed by problem.
+
+    Tours are stored as the raw bytes of their move-order board, in the
+    narrowest array type that holds its move numbers (one byte per square up
+    to 16 x 16, two up to 256 x 256, four beyond). The cache holds at most
+    `maxsize` tours and `maxbytes` bytes of them, evicting the least recently
+    used tours first; a tour larger than `maxbytes` is not kept at all.
+
+    A lock guards every access, so one cache can serve many threads.
+    """
+
+    def __init__(self, maxsize=256, maxbytes=256 * 2 ** 20):
+        self.maxsize = maxsize
+        self.maxbytes = maxbytes
+        self.nbytes = 0
+        self.hits = 0
+        self.misses = 0
+        self._tours = collections.OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return len(self._tours)
+
+    def get(self, key):
+        """
+        Looks up a tour and marks it as recently used.
+
+        Args:
+            key (tuple): The problem the tour solves.
+
+        Returns:
+            array: A fresh copy of the move-order board, or None on a miss.
+        """
+        with self._lock:
+            entry = self._tours.get(key)
+            if entry is None:
+                self.misses += 1
+                return None
+            self._tours.move_to_end(key)
+            self.hits += 1
+        return unpack(*entry)
+
+    def put(self, key, board):
+        """
+        Stores a tour, evicting the least recently used ones to make room.
+
+        Args:
+            key (tuple): The problem the tour solves.
+            board (array): The flat move-order board of the tour.
+        """
+        typecode, data = pack(board)
+        if len(data) > self.maxbytes or self.maxsize < 1:
+            return
+        with self._lock:
+            if key in self._tours:
+                self.nbytes -= len(self._tours.pop(key)[1])
+            self._tours[key] = (typecode, data)
+            self.nbytes += len(data)
+            while len(self._tours) > self.maxsize or self.nbytes > self.maxbytes:
+                self.nbytes -= len(self._tours.popitem(last=False)[1][1])
+
+    def clear(self):
+        """Drops every cached tour and resets the hit and miss counts."""
+        with self._lock:
+            self._tours.clear()
+            self.nbytes = self.hits = self.misses = 0
+
+
+# Tours found by `tour`, shared by every caller in the process.
+TOURS = TourCache()
+
+# Header of a tour file: magic, typecode, closed flag, rows, columns.
+TOUR_HEADER = struct.Struct('<4scBII2x')
+TOUR_MAGIC = b'KTT1'
+
+
+class MappedTour:
+    """
+    Read-only view of a tour file written by `DiskTourCache`.
+
+    The file is memory-mapped rather than read, so looking up a few squares
+    of a huge tour only touches the pages holding them.
+    """
+
+    def __init__(self, path):
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, typecode, closed, self.n, self.m = TOUR_HEADER.unpack_from(self._map)
+        if magic != TOUR_MAGIC:
+            self._map.close()
+            raise ValueError(f"{path} is not a tour file")
+        self.typecode = typecode.decode()
+        self.closed = bool(closed)
+        self._cell = struct.Struct('<' + self.typecode)
+
+    def __len__(self):
+        return self.n * self.m
+
+    def __getitem__(self, sq):
+        """Move number of the square with flat index `sq`."""
+        if not 0 <= sq < len(self):
+            raise IndexError(f"square {sq} is outside the {self.n}x{self.m} board")
+        return self._cell.unpack_from(self._map, TOUR_HEADER.size + sq * self._cell.size)[0]
+
+    def step(self, x, y):
+        """Move number of square (x, y)."""
+        return self[x * self.m + y]
+
+    def board(self):
+        """Reads the whole tour into a flat move-order board."""
+        return unpack(self.typecode, self._map[TOUR_HEADER.size:])
+
+    def close(self):
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class TourView:
+    """
+    Read-only view of a cached tour in the orientation of a request.
+
+    Cached tours are stored for the representative of their problem (see
+    `cache_key`); the view maps each square of the requested board onto the
+    cached one, and renumbers closed tours so that the start square is move
+    0, so `step` reads what `tour` would return for the request.
+    """
+
+    def __init__(self, mapped, n, m, start, sym):
+        self.mapped = mapped
+        self.n = n
+        self.m = m
+        self._sym = sym
+        self._shift = 0
+        if mapped.closed:
+            self._shift = self.step(*start)
+
+    def __len__(self):
+        return self.n * self.m
+
+    def step(self, x, y):
+        """Move number of square (x, y) of the requested board."""
+        if not (0 <= x < self.n and 0 <= y < self.m):
+            raise IndexError(f"square {(x, y)!r} is outside the {self.n}x{self.m} board")
+        _, _, cx, cy = transform_square(self.n, self.m, x, y, self._sym)
+        return (self.mapped.step(cx, cy) - self._shift) % len(self)
+
+    def close(self):
+        self.mapped.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+
+class DiskTourCache:
+    """
+    Persistent cache of finished tours, one binary file per problem.
+
+    A file holds a `TOUR_HEADER` followed by the move-order board in the
+    compact encoding of `pack`. Files are written to a temporary name and
+    renamed into place, so concurrent workers never see a partial tour. It
+    has the same get/put interface as `TourCache` and can be passed to
+    `tour(cache=...)`; `open` gives random access to a cached tour without
+    loading it, and `lookup` does so in the orientation of a request.
+    """
+
+    def __init__(self, directory):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path(self, key):
+        """
+        File name of the tour cached under `key`.
+
+        Args:
+            key (tuple): The problem the tour solves, as built by `tour`.
+
+        Returns:
+            str: Path of the tour file.
+        """
+        n, m, start, closed, engine, tiebreak, piece = key
+        where = 'closed' if closed else '{}.{}'.format(*start)
+        name = f'{n}x{m}-{where}-{engine}-{tiebreak}'
+        if piece != 'knight':  # Knight tours keep their names from before pieces
+            name += f'-{piece}'
+        return os.path.join(self.directory, name + '.kt')
+
+    def open(self, key):
+        """
+        Memory-maps a cached tour.
+
+        Args:
+            key (tuple): The problem the tour solves.
+
+        Returns:
+            MappedTour: The mapped tour, or None if it is not cached.
+        """
+        try:
+            return MappedTour(self.path(key))
+        except FileNotFoundError:
+            return None
+
+    def lookup(self, n, m=None, start=(0, 0), closed=False, engine=None, tiebreak='first',
+               piece='knight'):
+        """
+        Memory-maps the cached tour of a request, as `tour` would return it.
+
+        Takes the arguments of `tour`, so a worker can read single squares
+        of a tour another process cached without building its key.
+
+        Args:
+            n (int): Number of rows of the board.
+            m (int): Number of columns of the board. Defaults to `n`.
+            start (tuple): (x, y) square the tour starts from.
+            closed (bool): Whether the tour is closed.
+            engine (str): Name of the tour engine. Defaults to the one `tour`
+                picks, see `default_engine`.
+            tiebreak (str): Name of the tie-break rule.
+            piece (str): Name of the piece.
+
+        Returns:
+            TourView: The mapped tour, or None if it is not cached.
+        """
+        if m is None:
+            m = n
+        if engine is None:
+            engine = default_engine(piece, closed=closed)
+        sym, key = cache_key(n, m, start, closed, engine, tiebreak, piece)
+        mapped = self.open(key)
+        if mapped is None:
+            return None
+        return TourView(mapped, n, m, start, sym)
+
+    def get(self, key):
+        """
+        Loads a cached tour.
+
+        Args:
+            key (tuple): The problem the tour solves.
+
+        Returns:
+            array: The flat move-order board, or None on a miss.
+        """
+        mapped = self.open(key)
+        if mapped is None:
+            self.misses += 1
+            return None
+        self.hits += 1
+        with mapped:
+            return mapped.board()
+
+    def put(self, key, board):
+        """
+        Writes a tour to the cache, replacing any previous file for `key`.
+
+        Args:
+            key (tuple): The problem the tour solves.
+            board (array): The flat move-order board of the tour.
+        """
+        n, m, _, closed, *_ = key
+        typecode, data = pack(board)
+        fd, tmp = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(TOUR_HEADER.pack(TOUR_MAGIC, typecode.encode(), closed, n, m))
+                f.write(data)
+            os.replace(tmp, self.path(key))
+        except BaseException:
+            os.unlink(tmp)
+            raise
+
+
+def default_engine(piece='knight', blocked=None, topology='plane', closed=False):
+    """
+    Picks the engine `tour` uses when none is given.
+
+    Open tours go to the incremental engine. Closed tours of the knight on
+    a plain board go to the block engine, and all other closed tours to
+    the backtracking engine.
+
+    Args:
+        piece (str): The piece that tours the board, or its moves.
+        blocked (iterable): (x, y) squares cut out of the board.
+        topology (str): How the edges of the board connect.
+        closed (bool): Whether the tour is closed.
+
+    Returns:
+        str: The name of the engine, a key of `ENGINES`.
+    """
+    plain = piece in ('knight', KNIGHT) and not blocked and topology == 'plane'
+    return 'incremental' if not closed else 'blocks' if plain else 'backtrack'
+
+
+def tour(n=N, m=None, start=(0, 0), engine=None, tiebreak='first', max_nodes=None,
+         timeout=None, stats=None, closed=False, cache=TOURS, piece='knight', blocked=None,
+         topology='plane'):
+    """
+    Finds a Knight's Tour on an n x m board starting from the given square.
+
+    Every call builds its own board, so tours of different sizes and starts
+    can be computed concurrently from several threads or processes; the only
+    state they share is the tour cache, which is locked.
+
+    Found tours are kept in `cache` under their board size, start square,
+    closedness, engine, tie-break rule and piece, and repeated requests are served
+    from there. Problems related by a rotation or reflection of the board
+    share one entry (see `canonical`), and closed tours are cached once per
+    board and renumbered for each start square. Tours are not cached when
+    search statistics are requested or the tie-break rule is not given by
+    name.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the knight starts from.
+        engine (str): Name of the tour engine to use, one of the keys of
+            `ENGINES`. Defaults to the incremental engine, which does not
+            depend on the recursion limit and keeps degrees up to date
+            instead of recounting them, and to the block engine for closed
+            tours.
+        tiebreak (str): How engines that support it choose between moves of
+            equal degree: a key of `TIEBREAKS`, or a rule such as the one
+            returned by `move_order`.
+        max_nodes (int): Node budget of a backtracking engine, see
+            `kt_backtrack`.
+        timeout (float): Time budget in seconds of a backtracking engine.
+        stats (dict): Filled with search statistics by a backtracking engine.
+        closed (bool): Whether the last move must end a knight move away from
+            the start square, so the tour can be continued into a cycle.
+        cache (TourCache): Where to look up and keep found tours, or None.
+        piece (str): The piece that tours the board: a key of `PIECES`, or
+            its moves as built by `leaper` or `compound`. Every engine but
+            the block engine tours any piece.
+        blocked (iterable): (x, y) squares cut out of the board, for holes
+            and irregular outlines (see `load_mask`). The tour covers every
+            other square, and blocked squares are `BLOCKED` on the board.
+            Such boards are not cached, and the block engine does not take
+            them.
+        topology (str): How the edges of the board connect, a key of
+            `TOPOLOGIES`. Only engines working from an adjacency table
+            (see `adjacency`) tour a cylinder or torus, and such tours are
+            not cached.
+
+    Returns:
+        array: The flat board (row by row) filled with move numbers, or None
+        if no tour was found.
+    """
+    moves = piece
+    if isinstance(piece, str):
+        if piece not in PIECES:
+            raise ValueError(f"unknown piece {piece!r}, expected one of {sorted(PIECES)}")
+        moves = PIECES[piece]
+    knight = moves == KNIGHT
+    if m is None:
+        m = n
+    if engine is None:
+        engine = default_engine(piece, blocked, topology, closed)
+    if n < 1 or m < 1:
+        raise ValueError(f"board must be at least 1x1, got {n}x{m}")
+    x, y = start
+    if not (0 <= x < n and 0 <= y < m):
+        raise ValueError(f"start {start!r} is outside the {n}x{m} board")
+    if engine not in ENGINES:
+        raise ValueError(f"unknown engine {engine!r}, expected one of {sorted(ENGINES)}")
+    if engine == 'blocks' and not knight:
+        raise ValueError("the block engine only tours the knight")
+    if topology not in TOPOLOGIES:
+        raise ValueError(f"unknown topology {topology!r}, expected one of {sorted(TOPOLOGIES)}")
+    if topology != 'plane' and LAYOUTS.get(engine, adjacency) not in (adjacency, attacks, csr):
+        raise ValueError(f"engine {engine!r} only tours a plane board")
+    holes = frozenset()
+    if blocked:
+        for bx, by in blocked:
+            if not (0 <= bx < n and 0 <= by < m):
+                raise ValueError(f"blocked square {(bx, by)!r} is outside the {n}x{m} board")
+        holes = frozenset(bx * m + by for bx, by in blocked)
+        if x * m + y in holes:
+            raise ValueError(f"start {start!r} is blocked")
+        if engine == 'blocks':
+            raise ValueError("the block engine does not take blocked squares")
+
+    key = None
+    if isinstance(tiebreak, str):
+        if tiebreak not in TIEBREAKS:
+            raise ValueError(f"unknown tiebreak {tiebreak!r}, expected one of {sorted(TIEBREAKS)}")
+        if cache is not None and stats is None and isinstance(piece, str) and not holes \
+                and topology == 'plane':
+            sym, key = cache_key(n, m, (x, y), closed, engine, tiebreak, piece)
+        tiebreak = TIEBREAKS[tiebreak]
+    elif tuple(getattr(tiebreak, 'piece', moves)) != tuple(moves):
+        raise ValueError("the tiebreak rule was built for the moves of another piece, "
+                         "see move_order(piece=...)")
+
+    options = {'tiebreak': tiebreak, 'max_nodes': max_nodes, 'timeout': timeout, 'stats': stats,
+               'closed': closed or None}
+    options = {key: value for key, value in options.items() if value is not None}
+    unsupported = set(options) - ENGINE_OPTIONS.get(engine, set())
+    if unsupported:
+        raise ValueError(f"engine {engine!r} does not support {', '.join(sorted(unsupported))}")
+    if closed and knight and not holes and topology == 'plane' and not closable(n, m):
+        return None
+
+    if key is not None:
+        board = cache.get(key)
+        if board is not None:
+            board = transform(board, key[0], key[1], inverse(sym))
+            return rotate(board, x * m + y) if closed else board
+
+    # The plain knight board shares the default layouts
+    shape = (n, m) if knight and not holes and topology == 'plane' else (n, m, moves)
+    tables = shape if len(shape) == 2 else (n, m, moves, holes, topology)
+    if tiebreak is not None:
+        options['tiebreak'] = tiebreak(n, m, adjacency(*tables))
+
+    board = array('i', [-1]) * (n * m)  # Initialize the board, one cell per square
+    for hole in holes:
+        board[hole] = BLOCKED
+    board[x * m + y] = 0  # Start knight at the requested square
+
+    layout = LAYOUTS.get(engine, adjacency)
+    # Padded engines find the holes on the board itself
+    structure = layout(*shape) if layout is padding else layout(*tables)
+    if not ENGINES[engine](board, structure, x * m + y, 1, **options):
+        return None
+    if key is not None:
+        cache.put(key, transform(board, n, m, sym))
+    return board
+
+
+def solve(n=N, m=None, start=(0, 0), engine=None, tiebreak='first', max_nodes=None,
+          timeout=None, closed=False, cache=TOURS, piece='knight', blocked=None, topology='plane'):
+    """
+    Solves the Knight's Tour problem using Warnsdorff's heuristic.
+
+    The goal is to move a knight on a chessboard such that it visits every
+    square exactly once. Warnsdorff's heuristic helps guide the knight's moves
+    by always selecting the next square that has the fewest onward moves.
+
+    The function starts at position `start` (the corner (0, 0) by default) of
+    an n x m board and attempts to find a tour. If successful, it prints the
+    solution; otherwise, it indicates that no solution was found.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the knight starts from.
+        engine (str): Name of the tour engine to use, one of the keys of
+            `ENGINES`. Backtracking engines also print how many nodes they
+            expanded.
+        tiebreak (str): Tie-break rule between moves of equal degree, a key
+            of `TIEBREAKS`.
+        max_nodes (int): Node budget of a backtracking engine.
+        timeout (float): Time budget in seconds of a backtracking engine.
+        closed (bool): Whether to look for a closed tour.
+        cache (TourCache): Where to look up and keep found tours, for
+            instance a `DiskTourCache` to keep them across runs, or None.
+        piece (str): The piece that tours the board, a key of `PIECES`.
+        blocked (iterable): (x, y) squares cut out of the board.
+        topology (str): How the edges of the board connect, a key of
+            `TOPOLOGIES`.
+
+    Returns:
+        bool: True if a solution was found, False otherwise.
+    """
+    stats = {} if 'stats' in ENGINE_OPTIONS.get(engine, ()) else None
+    board = tour(n, m, start, engine, tiebreak, max_nodes, timeout, stats, closed, cache, piece,
+                 blocked, topology)
+    if board is not None:
+        display(board, m or n)
+    if stats is not None:
+        print(f"Nodes expanded: {stats['nodes']}")
+    return board is not None
+
+
+# Outcome of one tour request, whatever the engine: whether a tour was found,
+# the tour, the engine that ran, the seconds it took, and the nodes it expanded
+# (None for engines that do not count them).
+Result = collections.namedtuple('Result', ['found', 'board', 'engine', 'seconds', 'nodes'])
+
+
+def search(n=N, m=None, start=(0, 0), engine=None, **options):
+    """
+    Looks for a tour and reports how the search went.
+
+    The same request as `tour`, but the answer has the same shape for every
+    engine, so callers can switch engines per request, say 'backtrack' on a
+    small board and 'posa' on a masked one, and compare the outcomes.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the piece starts from.
+        engine (str): Name of the tour engine, a key of `ENGINES`. Defaults
+            to the one `tour` picks, see `default_engine`.
+        **options: Further keyword arguments for `tour`, such as `closed`,
+            `piece`, `blocked` or `max_nodes`.
+
+    Returns:
+        Result: The outcome of the search.
+    """
+    if engine is None:
+        engine = default_engine(options.get('piece', 'knight'), options.get('blocked'),
+                                options.get('topology', 'plane'), options.get('closed', False))
+    stats = {} if 'stats' in ENGINE_OPTIONS.get(engine, ()) else None
+    began = time.perf_counter()
+    board = tour(n, m, start, engine, stats=stats, **options)
+    seconds = time.perf_counter() - began
+    nodes = None if stats is None else stats.get('nodes')
+    return Result(board is not None, board, engine, seconds, nodes)
+
+
+def walk(n=N, m=None, start=(0, 0), engine='compact', closed=False):
+    """
+    Streams a Knight's Tour on an n x m board move by move.
+
+    Moves are yielded as soon as they are chosen instead of filling a board,
+    so a consumer can write a huge tour out while it is being walked. Only
+    the engines that never take a move back can stream:
+
+    - 'compact' walks Warnsdorff's rule as `kt_compact` does, keeping just
+      its padded degree array, about one byte per square.
+    - 'blocks' walks the blocks of `kt_blocks` one after the other (see
+      `stitch`), keeping only a handful of block paths, so memory does not
+      grow with the area of the board. A closed tour is walked from the
+      block holding the start square and wraps around to finish.
+
+    As moves already yielded cannot be taken back, a walk that gets stuck
+    raises instead of returning a partial tour.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the knight starts from.
+        engine (str): 'compact' or 'blocks'.
+        closed (bool): Whether the last move must end a knight move away from
+            the start square. Only supported by the block engine.
+
+    Yields:
+        tuple: (step, x, y) of every move, starting with step 0 on `start`.
+
+    Raises:
+        RuntimeError: If the walk gets stuck before covering the board.
+    """
+    if m is None:
+        m = n
+    if n < 1 or m < 1:
+        raise ValueError(f"board must be at least 1x1, got {n}x{m}")
+    x, y = start
+    if not (0 <= x < n and 0 <= y < m):
+        raise ValueError(f"start {start!r} is outside the {n}x{m} board")
+    if engine not in ('compact', 'blocks'):
+        raise ValueError(f"engine {engine!r} cannot stream, expected 'compact' or 'blocks'")
+    if closed and engine != 'blocks':
+        raise ValueError(f"engine {engine!r} does not support closed")
+    total = n * m
+    step = 0
+
+    if engine == 'compact':
+        _, _, offsets, border = pad = padding(n, m)
+        width = m + 2 * border
+        deg = padded_degrees(pad)
+        p = (x + border) * width + y + border
+        while True:
+            yield step, x, y
+            step += 1
+            deg[p] += VISITED
+            for off in offsets:
+                deg[p + off] -= 1
+            if step == total:
+                return
+            temp = len(offsets) + 1
+            for off in offsets:
+                d = deg[p + off]
+                if d < temp:
+                    temp = d
+                    nxt = p + off
+            if temp > len(offsets):
+                raise RuntimeError(f"walk stuck after {step} of {total} squares")
+            p = nxt
+            x, y = divmod(p, width)
+            x, y = x - border, y - border
+
+    tiles = tiling(n, m, closed)
+    flip_x = flip_y = False
+    if not closed:
+        if x not in (0, n - 1) or y not in (0, m - 1):
+            raise ValueError("the block engine starts an open tour from a corner of the board")
+        flip_x, flip_y = x == n - 1, y == m - 1
+    elif not closable(n, m):
+        raise RuntimeError(f"the {n}x{m} board has no closed tour")
+
+    def squares():
+        """Board coordinates of the stitched tour, in walking order."""
+        for base, path in stitch(tiles, closed):
+            for offset in path:
+                sx, sy = divmod(base + offset, m)
+                yield (n - 1 - sx if flip_x else sx), (m - 1 - sy if flip_y else sy)
+
+    shift = None  # Step of the start square in the stitched tour
+    for i, square in enumerate(squares()):
+        if shift is None and square == start:
+            shift = i
+        if shift is not None:
+            yield (i - shift, *square)
+            step += 1
+    if shift:  # Wrap around to the beginning of the cycle
+        for i, square in zip(range(shift), squares()):
+            yield (step + i, *square)
+        step += shift
+    if step < total:
+        raise RuntimeError(f"walk stuck after {step} of {total} squares")
+
+
+def tour_nd(shape, start=None, engine='compact', piece=None, max_nodes=None, timeout=None,
+            stats=None, tiebreak='first'):
+    """
+    Finds an open tour on a board with any number of dimensions.
+
+    The board is stored flat, last axis fastest, like the 2D boards. The
+    'compact' engine walks Warnsdorff's rule on a padded lattice (see
+    `kt_lattice`) and is the one to use on large boards: with the board itself,
+    it takes about ten bytes per square. Any engine of `ENGINES` that works on
+    an adjacency table, such as 'incremental' or 'backtrack', runs on the
+    table of `lattice_adjacency` instead, which only suits small boards.
+
+    Args:
+        shape (tuple): Side length of the board along each axis, at least two.
+        start (tuple): Coordinates of the start square. Defaults to the
+            corner at the origin.
+        engine (str): 'compact', or the name of an adjacency table engine.
+        piece (tuple): Moves of the piece, see `hyperleaper`. Defaults to the
+            knight of the board's dimension.
+        max_nodes (int): Node budget of a backtracking engine.
+        timeout (float): Time budget in seconds of a backtracking engine.
+        stats (dict): Filled by a backtracking engine, see `kt_backtrack`.
+        tiebreak (str): How engines that support it choose between moves of
+            equal degree: 'first', 'pohl' (see `pohl`), or a rule such as
+            the one built by `randomized`. Rules that rank moves by their
+            place on a 2D board, 'roth' and `move_order`, do not apply. A
+            rule is built as for a board of shape[0] rows whose columns are
+            the remaining axes, flattened.
+
+    Returns:
+        array: The flat move-order board, or None if no tour was found.
+    """
+    shape = tuple(shape)
+    if len(shape) < 2 or min(shape) < 1:
+        raise ValueError(f"board must have at least two axes of length 1 or more, got {shape}")
+    if piece is None:
+        piece = hyperleaper(1, 2, len(shape))
+    piece = tuple(map(tuple, piece))
+    if any(len(move) != len(shape) for move in piece):
+        raise ValueError(f"moves of the piece must have {len(shape)} coordinates")
+    start = (0,) * len(shape) if start is None else tuple(start)
+    if len(start) != len(shape) or not all(0 <= c < side for c, side in zip(start, shape)):
+        raise ValueError(f"start {start!r} is outside the {shape} board")
+    if engine != 'compact' and (engine not in ENGINES or engine in LAYOUTS):
+        raise ValueError(f"engine {engine!r} cannot tour a board of any dimension")
+    if isinstance(tiebreak, str):
+        if tiebreak not in ('first', 'pohl'):
+            raise ValueError(f"tiebreak {tiebreak!r} does not apply to a board of any dimension, "
+                             "expected 'first' or 'pohl'")
+        tiebreak = TIEBREAKS[tiebreak]
+    elif hasattr(tiebreak, 'piece'):
+        raise ValueError("a move_order rule does not apply to a board of any dimension")
+
+    options = {'tiebreak': tiebreak, 'max_nodes': max_nodes, 'timeout': timeout, 'stats': stats}
+    options = {key: value for key, value in options.items() if value is not None}
+    unsupported = set(options) - ENGINE_OPTIONS.get(engine, set())
+    if unsupported:
+        raise ValueError(f"engine {engine!r} does not support {', '.join(sorted(unsupported))}")
+
+    sq = 0
+    for c, side in zip(start, shape):
+        sq = sq * side + c
+    board = array('i', [-1]) * functools.reduce(lambda a, b: a * b, shape)
+    board[sq] = 0
+    if engine == 'compact':
+        found = kt_lattice(board, lattice(shape, piece), sq, 1)
+    else:
+        adj = lattice_adjacency(shape, piece)
+        if tiebreak is not None:
+            options['tiebreak'] = tiebreak(shape[0], len(board) // shape[0], adj)
+        found = ENGINES[engine](board, adj, sq, 1, **options)
+    return board if found else None
+
+
+def kt(board, adj, sq, pos):
+    """
+    Recursively attempts to solve the Knight's Tour problem using Warnsdorff's rule.
+
+    This function moves the knight to the reachable position with the least
+    onward moves. If it reaches a dead-end, it unwinds the moves it made and
+    reports failure without trying the other moves; `kt_backtrack` does.
+
+    Args:
+        board (list): The current state of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    temp = VISITED
+    nsq = -1
+
+    for nb in adj[sq]:
+        if check(nb, board):
+            deg = degree(nb, board, adj)
+            if deg < temp:
+                temp = deg
+                nsq = nb
+
+    if nsq == -1:  # No valid move found: done if no square is left, else a dead-end
+        return -1 not in board
+
+    board[nsq] = pos
+
+    if kt(board, adj, nsq, pos + 1):
+        return True
+
+    board[nsq] = -1
+    return False
+
+
+def kt_iterative(board, adj, sq, pos):
+    """
+    Iteratively walks the Knight's Tour using Warnsdorff's rule.
+
+    This is the loop-based counterpart of `kt`: it picks exactly the same
+    moves, but keeps the walk in a single frame instead of recursing once per
+    move, so it runs in constant stack space on boards of any size and skips
+    the per-move call overhead. On a dead-end the squares it filled are
+    cleared again, just like `kt` unwinding its recursion.
+
+    Args:
+        board (list): The current state of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    first = pos
+    last = pos + board.count(-1)
+
+    while pos < last:
+        temp = VISITED
+        nsq = -1
+
+        for nb in adj[sq]:
+            if board[nb] == -1:
+                deg = 0
+                for nnb in adj[nb]:
+                    if board[nnb] == -1:
+                        deg += 1
+                if deg < temp:
+                    temp = deg
+                    nsq = nb
+
+        if nsq == -1:  # No valid move found (dead-end), undo this walk
+            for i, cell in enumerate(board):
+                if cell >= first:
+                    board[i] = -1
+            return False
+
+        board[nsq] = pos
+        sq = nsq
+        pos += 1
+
+    return True
+
+
+def degrees(board, adj):
+    """
+    Computes the onward degree of every square of the board.
+
+    Visited squares are flagged by adding `VISITED` to their count, which
+    keeps them above any real degree, so a single comparison against the
+    current minimum both skips visited squares and applies Warnsdorff's rule.
+
+    Args:
+        board (list): The current board configuration showing visited cells.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
+
+    Returns:
+        list: Number of unvisited neighbors of each square, plus `VISITED`
+        for squares already on the tour.
+    """
+    deg = list(map(len, adj))
+    for sq, cell in enumerate(board):
+        if cell != -1:
+            deg[sq] += VISITED
+            for nb in adj[sq]:
+                deg[nb] -= 1
+    return deg
+
+
+def kt_incremental(board, adj, sq, pos, tiebreak=None):
+    """
+    Walks the Knight's Tour using Warnsdorff's rule with live degree counts.
+
+    Instead of rescanning the neighbors of every candidate with `degree`, a
+    degree array is built once and kept up to date: visiting a square
+    decrements the degree of each of its neighbors, and undoing a visit
+    increments them again. Choosing the next move then only reads the
+    degrees of the current square's neighbors, so each step costs O(8)
+    instead of O(64). Without a tie-break rule the moves chosen are exactly
+    those of `kt`.
+
+    Args:
+        board (list): The current state of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+        tiebreak (function): rank(sq, nb, deg) deciding between moves of
+            equal degree, lowest rank first, or None to keep the first one.
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    deg = degrees(board, adj)
+    first = pos
+    last = pos + board.count(-1)
+
+    while pos < last:
+        temp = VISITED - 1  # Above any degree, below any visited square
+        nsq = -1
+
+        for nb in adj[sq]:
+            d = deg[nb]
+            if d < temp:
+                temp = d
+                nsq = nb
+                best = None
+            elif d == temp and tiebreak is not None:
+                if best is None:
+                    best = tiebreak(sq, nsq, deg)
+                rank = tiebreak(sq, nb, deg)
+                if rank < best:
+                    best = rank
+                    nsq = nb
+
+        if nsq == -1:  # No valid move found (dead-end), undo this walk
+            for i, cell in enumerate(board):
+                if cell >= first:
+                    board[i] = -1
+                    deg[i] -= VISITED
+                    for nb in adj[i]:
+                        deg[nb] += 1
+            return False
+
+        board[nsq] = pos
+        deg[nsq] += VISITED
+        for nb in adj[nsq]:
+            deg[nb] -= 1
+        sq = nsq
+        pos += 1
+
+    return True
+
+
+def padded_degrees(pad):
+    """
+    Builds the live degree array of an empty padded board.
+
+    Args:
+        pad (Padded): Padded move structure of the board, see `padding`.
+
+    Returns:
+        bytearray: The degree of every square of the padded board, with
+        `VISITED` on the border cells.
+    """
+    n, m, offsets, border = pad
+    width = m + 2 * border
+    deg = bytearray([VISITED]) * (width * (n + 2 * border))
+    inside = bytearray(width * (n + 2 * border))
+    for x in range(border, n + border):
+        inside[x * width + border:x * width + border + m] = b'\x01' * m
+
+    rows = {}  # Degrees only depend on the distance to the edges
+    for x in range(n):
+        start = (x + border) * width + border
+        key = (min(x, border), min(n - 1 - x, border))
+        if key not in rows:
+            rows[key] = bytes(sum(inside[p + off] for off in offsets) for p in range(start, start + m))
+        deg[start:start + m] = rows[key]
+    return deg
+
+
+def kt_compact(board, pad, sq, pos):
+    """
+    Walks the Knight's Tour using Warnsdorff's rule on a padded byte board.
+
+    This is `kt_incremental` without the adjacency table: the live degrees
+    are kept in one bytearray covering the padded board (see `padding`), in
+    which border cells and visited squares carry `VISITED`. That array is at
+    the same time the visited bitmap and the bounds check, so a move is just
+    an index offset, and together with the move-order `board` the whole walk
+    needs five bytes per square. The moves chosen are exactly those of `kt`.
+
+    Args:
+        board (array): The flat move-order board, row by row.
+        pad (Padded): Padded move structure of the board, see `padding`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    _, m, offsets, border = pad
+    width = m + 2 * border
+    deg = padded_degrees(pad)
+    for i, cell in enumerate(board):
+        if cell != -1:
+            p = (i // m + border) * width + i % m + border
+            deg[p] += VISITED
+            for off in offsets:
+                deg[p + off] -= 1
+
+    first = pos
+    last = pos + board.count(-1)
+    p = (sq // m + border) * width + sq % m + border
+
+    while pos < last:
+        temp = len(offsets) + 1
+        nxt = -1
+
+        for off in offsets:
+            d = deg[p + off]
+            if d < temp:
+                temp = d
+                nxt = p + off
+
+        if nxt == -1:  # No valid move found (dead-end), undo this walk
+            for i, cell in enumerate(board):
+                if cell >= first:
+                    board[i] = -1
+                    p = (i // m + border) * width + i % m + border
+                    deg[p] -= VISITED
+                    for off in offsets:
+                        deg[p + off] += 1
+            return False
+
+        x, y = divmod(nxt, width)
+        board[(x - border) * m + y - border] = pos
+        deg[nxt] += VISITED
+        for off in offsets:
+            deg[nxt + off] -= 1
+        p = nxt
+        pos += 1
+
+    return True
+
+
+def kt_numpy(board, pad, sq, pos):
+    """
+    Walks the Knight's Tour using Warnsdorff's rule on NumPy arrays.
+
+    The same walk as `kt_compact`, on an int32 padded degree map. The map is
+    built with one shifted sum of the board per knight move instead of a
+    loop over the squares, and each move reads and updates the degrees of
+    the knight's neighbors through the precomputed array of move offsets.
+    `numpy.argmin` keeps the first of equal degrees, so the moves chosen are
+    exactly those of `kt`. Without NumPy, `kt_compact` is used instead.
+
+    Args:
+        board (array): The flat move-order board, row by row.
+        pad (Padded): Padded move structure of the board, see `padding`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    if numpy is None:
+        return kt_compact(board, pad, sq, pos)
+    n, m, offsets, border = pad
+    width = m + 2 * border
+    core = (slice(border, n + border), slice(border, m + border))
+    cells = numpy.frombuffer(board, dtype=numpy.int32)  # Shares memory with `board`
+    free = numpy.zeros((n + 2 * border, width), dtype=numpy.int32)
+    free[core] = cells.reshape(n, m) == -1
+    deg = numpy.full((n + 2 * border, width), VISITED, dtype=numpy.int32)
+    deg[core] = numpy.where(free[core], 0, VISITED)
+    for off in offsets:  # Squares one move away are `off` further in the padded layout
+        deg[core] += numpy.roll(free, -off)[core]
+    deg = deg.ravel()
+
+    offsets = numpy.array(offsets, dtype=numpy.intp)
+    first = pos
+    last = pos + board.count(-1)
+    p = (sq // m + border) * width + sq % m + border
+
+    nbs = p + offsets
+    while pos < last:
+        near = deg[nbs]
+        k = near.argmin()
+        if near[k] > len(offsets):  # No valid move found (dead-end), undo this walk
+            cells[cells >= first] = -1
+            return False
+
+        p = int(nbs[k])
+        x, y = divmod(p, width)
+        cells[(x - border) * m + y - border] = pos
+        deg[p] += VISITED
+        nbs = p + offsets
+        deg[nbs] -= 1
+        pos += 1
+
+    return True
+
+
+def kt_lattice(board, lat, sq, pos):
+    """
+    Walks a tour with Warnsdorff's rule on a padded board of any dimension.
+
+    `kt_compact` for boards with more than two axes, such as 3D cuboids: the
+    live degrees sit in one bytearray over the padded board (see `lattice`),
+    a move is an index offset, and the flat square of each move is read off
+    the lattice. Besides the board itself the walk needs about five bytes
+    per padded square.
+
+    Args:
+        board (array): The flat move-order board, last axis fastest.
+        lat (Lattice): Padded move structure of the board, see `lattice`.
+        sq (int): Flat index of the piece's current square.
+        pos (int): The number of the current move (starting from 1).
+
+    Returns:
+        bool: True if the piece successfully completes the tour, False otherwise.
+    """
+    shape, offsets, border, strides, squares = lat
+    deg = bytearray([VISITED]) * len(squares)
+    degs = {}  # Degrees only depend on the distance to the edges
+    length = shape[-1]
+    for coords, start in padded_rows(shape, border, strides):
+        key = tuple((min(c, border), min(side - 1 - c, border)) for c, side in zip(coords, shape))
+        if key not in degs:
+            degs[key] = bytes(
+                sum(squares[p + off] >= 0 for off in offsets) for p in range(start, start + length)
+            )
+        deg[start:start + length] = degs[key]
+
+    padded = {}  # Padded index of each square already on the tour, and of `sq`
+    for _, start in padded_rows(shape, border, strides):
+        row = squares[start]
+        for i in range(length):
+            if board[row + i] != -1:
+                padded[row + i] = start + i
+    for p in padded.values():
+        deg[p] += VISITED
+        for off in offsets:
+            deg[p + off] -= 1
+
+    first = pos
+    last = pos + board.count(-1)
+    p = padded[sq]
+
+    while pos < last:
+        temp = len(offsets) + 1
+        nxt = -1
+
+        for off in offsets:
+            d = deg[p + off]
+            if d < temp:
+                temp = d
+                nxt = p + off
+
+        if nxt == -1:  # No valid move found (dead-end), undo this walk
+            for i, cell in enumerate(board):
+                if cell >= first:
+                    board[i] = -1
+            return False
+
+        board[squares[nxt]] = pos
+        deg[nxt] += VISITED
+        for off in offsets:
+            deg[nxt + off] -= 1
+        p = nxt
+        pos += 1
+
+    return True
+
+
+def kt_backtrack(board, adj, sq, pos, tiebreak=None, max_nodes=None, timeout=None, stats=None,
+                 ends=None, closed=False):
+    """
+    Searches for a Knight's Tour with full backtracking in Warnsdorff order.
+
+    Unlike the greedy engines, which give up at the first dead-end, this
+    search tries every onward move of a square, fewest onward moves first
+    (ties keep the order of the moves), and backs up to the most recent square with
+    an untried move when it gets stuck. Its first path is therefore exactly
+    the greedy walk (with the same tie-break rule), and backtracking only
+    kicks in where that walk fails. The search keeps its own stack and live
+    degree counts as in `kt_incremental`, so its depth is not bounded by the
+    recursion limit.
+
+    The tour can be required to finish on one of a set of `ends` squares.
+    That condition is part of the search rather than a filter on finished
+    tours: the last move may only go to an end square, and no move may use
+    up the last unvisited end square before then. A closed tour is the case
+    where the end squares are the neighbors of the start square.
+
+    Branches that can no longer lead to a tour are cut as soon as they are
+    entered: when an unvisited square out of the knight's reach has no
+    unvisited neighbor left, when two of them have only one (both would
+    have to be the last square), or when the unvisited squares of the two
+    colors no longer alternate from the knight's square. The counts behind
+    these checks are kept up to date with the degrees, so each check only
+    looks at the knight's neighbors. The squares visited are the same as
+    without the cuts, minus the dead branches.
+
+    Since a search can take exponential time, it can be bounded by a number
+    of expanded nodes (squares visited) and by wall-clock time; running out
+    of either counts as not finding a tour.
+
+    Args:
+        board (list): The current state of the board.
+        adj (tuple): Adjacency table of the board, see `adjacency`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+        tiebreak (function): rank(sq, nb, deg) ordering moves of equal
+            degree, lowest rank first, or None to keep the order of the moves.
+        max_nodes (int): Maximum number of nodes to expand, or None.
+        timeout (float): Maximum search time in seconds, or None.
+        stats (dict): If given, receives the number of expanded nodes under
+            'nodes' and whether a budget ran out under 'exhausted'.
+        ends (set): Squares the tour may finish on, or None for any square.
+        closed (bool): Whether the tour must finish a knight move away from
+            `sq`, which overrides `ends`.
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    deg = degrees(board, adj)
+    first = pos
+    last = pos + board.count(-1)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    nodes = 0
+    exhausted = False
+
+    def moves(sq):
+        """Unvisited neighbors of `sq`, in the order they are to be tried."""
+        if tiebreak is None:
+            key = deg.__getitem__
+        else:
+            def key(nb):
+                return deg[nb], tiebreak(sq, nb, deg)
+        return iter(sorted((nb for nb in adj[sq] if deg[nb] < VISITED), key=key))
+
+    def doomed(sq):
+        """Whether the unvisited squares can no longer all be toured from `sq`."""
+        left = last - pos - 1
+        if left < 2:
+            return False
+        near = [0, 0]
+        for nb in adj[sq]:
+            if deg[nb] < 2:
+                near[deg[nb]] += 1
+        # A square with no exits left can only be reached from here, as the
+        # last one; a square with one exit, out of reach from here, can only
+        # be the last one. And the rest of the tour alternates colors,
+        # starting with the one `sq` is not.
+        away, here = left_by[1 - color[sq]], left_by[color[sq]]
+        return near[0] or low[0] > near[0] or low[1] - near[1] > 1 or \
+            bipartite and not 0 <= away - here <= 1
+
+    if closed:
+        ends = set(adj[sq])
+    if ends is not None:
+        open_ends = sum(1 for e in ends if board[e] == -1)
+    low = [0, 0]  # Number of unvisited squares with no and with one exit
+    for d in deg:
+        if d < 2:
+            low[d] += 1
+    color = [-1] * len(board)  # A knight changes square color on every move
+    bipartite = True  # Other pieces may not
+    for root in range(len(board)):
+        if color[root] == -1:
+            color[root] = 0
+            todo = [root]
+            while todo:
+                i = todo.pop()
+                for nb in adj[i]:
+                    if color[nb] == -1:
+                        color[nb] = 1 - color[i]
+                        todo.append(nb)
+                    elif color[nb] == color[i]:
+                        bipartite = False
+    left_by = [0, 0]  # Number of unvisited squares of each color
+    for i, cell in enumerate(board):
+        if cell == -1:
+            left_by[color[i]] += 1
+
+    path = [sq]
+    stack = [moves(sq)]
+
+    while pos < last:
+        nsq = next(stack[-1], -1)
+
+        if nsq == -1:  # All moves from this square failed, step back
+            stack.pop()
+            if not stack:
+                break
+            sq = path.pop()
+            board[sq] = -1
+            deg[sq] -= VISITED
+            if deg[sq] < 2:
+                low[deg[sq]] += 1
+            left_by[color[sq]] += 1
+            for nb in adj[sq]:
+                d = deg[nb]
+                if d < 2:
+                    low[d] -= 1
+                    if d < 1:
+                        low[1] += 1
+                deg[nb] = d + 1
+            if ends is not None and sq in ends:
+                open_ends += 1
+            pos -= 1
+            continue
+
+        if ends is not None:
+            if nsq in ends:
+                if open_ends == 1 and pos < last - 1:  # Keep it for the finish
+                    continue
+                open_ends -= 1
+            elif pos == last - 1:  # The tour must finish on an end square
+                continue
+
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes or \
+                deadline is not None and not nodes & 1023 and time.monotonic() > deadline:
+            exhausted = True
+            nodes -= 1
+            for i, cell in enumerate(board):  # Undo the partial tour
+                if cell >= first:
+                    board[i] = -1
+            break
+
+        board[nsq] = pos
+        d = deg[nsq]
+        if d < 2:
+            low[d] -= 1
+        deg[nsq] = d + VISITED
+        left_by[color[nsq]] -= 1
+        for nb in adj[nsq]:
+            d = deg[nb]
+            if d < 3:
+                if d < 2:
+                    low[d] -= 1
+                low[d - 1] += 1
+            deg[nb] = d - 1
+        path.append(nsq)
+        stack.append(iter(()) if doomed(nsq) else moves(nsq))
+        pos += 1
+
+    if stats is not None:
+        stats['nodes'] = nodes
+        stats['exhausted'] = exhausted
+    return pos == last
+
+
+def kt_bitboard(board, masks, sq, pos, max_nodes=None, timeout=None, stats=None):
+    """
+    Searches for a Knight's Tour with full backtracking on bitboards.
+
+    The same search as `kt_backtrack`, fewest onward moves first, but the
+    unvisited squares are one int used as a bitboard: visiting or leaving a
+    square flips one bit, and the degree of a square is the popcount of its
+    attack mask (see `attacks`) and the free squares, so no degree array is
+    kept up to date. Ties are tried in square order rather than move
+    order. The board is only written once a tour is found, which makes
+    this the engine of choice for long or exhaustive searches on small
+    boards.
+
+    Every mask is as wide as the board, so each popcount costs a word per
+    64 squares: the search runs about twice as fast as `kt_backtrack`
+    on boards of a word or two, but slows down as the board grows (from
+    about 580k nodes/s on 5 x 5 to under 100k on 40 x 40), where
+    `kt_backtrack` is the better choice.
+
+    Args:
+        board (array): The flat move-order board, row by row.
+        masks (tuple): Attack masks of the board, see `attacks`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+        max_nodes (int): Maximum number of nodes to expand, or None.
+        timeout (float): Maximum search time in seconds, or None.
+        stats (dict): If given, receives the number of expanded nodes under
+            'nodes' and whether a budget ran out under 'exhausted'.
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    free = sum(1 << i for i, cell in enumerate(board) if cell == -1)
+    first = pos
+    last = pos + board.count(-1)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    nodes = 0
+    exhausted = False
+
+    def moves(sq):
+        """Unvisited neighbors of `sq`, fewest onward moves first."""
+        options = []
+        near = masks[sq] & free
+        while near:
+            bit = near & -near
+            nb = bit.bit_length() - 1
+            options.append(((masks[nb] & free).bit_count(), nb))
+            near ^= bit
+        options.sort()
+        return iter([nb for _, nb in options])
+
+    path = [sq]
+    stack = [moves(sq)]
+
+    while pos < last:
+        nsq = next(stack[-1], -1)
+
+        if nsq == -1:  # All moves from this square failed, step back
+            stack.pop()
+            if not stack:
+                break
+            free |= 1 << path.pop()
+            pos -= 1
+            continue
+
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes or \
+                deadline is not None and not nodes & 1023 and time.monotonic() > deadline:
+            exhausted = True
+            nodes -= 1
+            break
+
+        free ^= 1 << nsq
+        path.append(nsq)
+        stack.append(moves(nsq))
+        pos += 1
+
+    if stats is not None:
+        stats['nodes'] = nodes
+        stats['exhausted'] = exhausted
+    if pos < last:
+        return False
+    for step, square in enumerate(path[1:], first):
+        board[square] = step
+    return True
+
+
+def kt_posa(board, graph, sq, pos, max_nodes=None, timeout=None, stats=None, closed=False):
+    """
+    Searches for a Knight's Tour by Posa's rotation-extension method.
+
+    The path grows from its far end by Warnsdorff's rule. When the end has
+    no unvisited neighbor left, the search does not back up: it picks a
+    neighbor `v` of the end further down the path and reverses the stretch
+    of path after `v`, so the square after `v` becomes the new end and the
+    path still covers the same squares. Rotations prefer new ends with an
+    unvisited neighbor, and are otherwise picked at random (from a fixed
+    seed, so results are repeatable). A closed tour keeps rotating the
+    finished path until its end is one move from the start square.
+
+    Dead-ends thus cost one reversal instead of a subtree, which suits
+    masked and oddly shaped boards where backtracking blows up, but the
+    search cannot prove that no tour exists. Without a budget it gives up
+    after 100 nodes (extensions and rotations) per square to visit.
+
+    Args:
+        board (array): The flat move-order board, row by row.
+        graph (Graph): Move graph of the board, see `csr`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+        max_nodes (int): Maximum number of extensions and rotations, or None.
+        timeout (float): Maximum search time in seconds, or None.
+        stats (dict): If given, receives the number of nodes under 'nodes'
+            and whether a budget ran out under 'exhausted'.
+        closed (bool): Whether the tour must finish a knight move away from
+            `sq`.
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    offsets, neighbors = graph
+    first = pos
+    last = pos + board.count(-1)
+    if max_nodes is None and timeout is None:
+        max_nodes = 100 * (last - first + 1)
+    deadline = None if timeout is None else time.monotonic() + timeout
+    rng = random.Random(0)
+    nodes = 0
+    exhausted = False
+
+    where = array('i', [-1]) * len(board)  # Index of each square on the path
+    deg = array('i', [0]) * len(board)  # Unvisited neighbors of each square
+    for s, cell in enumerate(board):
+        if cell == -1:
+            for nb in neighbors[offsets[s]:offsets[s + 1]]:
+                deg[nb] += 1
+    path = [sq]
+    where[sq] = 0
+    home = frozenset(neighbors[offsets[sq]:offsets[sq + 1]]) if closed else None
+
+    while pos < last or home is not None and path[-1] not in home:
+        nodes += 1
+        if max_nodes is not None and nodes > max_nodes or \
+                deadline is not None and not nodes & 1023 and time.monotonic() > deadline:
+            exhausted = True
+            nodes -= 1
+            break
+
+        end = path[-1]
+        nbs = neighbors[offsets[end]:offsets[end + 1]]
+        if pos < last:
+            temp = len(board) + 1
+            nxt = -1
+            for nb in nbs:
+                # A square with no way on is taken last, as the end is stuck there
+                d = deg[nb] or len(board)
+                if board[nb] == -1 and where[nb] == -1 and d < temp:
+                    temp = d
+                    nxt = nb
+            if nxt != -1:  # Extend the path
+                where[nxt] = len(path)
+                path.append(nxt)
+                for nb in neighbors[offsets[nxt]:offsets[nxt + 1]]:
+                    deg[nb] -= 1
+                pos += 1
+                continue
+
+        # Rotate: the end jumps back onto the path, after which it is reversed
+        pivots = [where[nb] for nb in nbs if 0 <= where[nb] < len(path) - 2]
+        while not pivots and len(path) > 1:  # Cornered: retreat to a square that can rotate
+            end = path.pop()
+            where[end] = -1
+            for nb in neighbors[offsets[end]:offsets[end + 1]]:
+                deg[nb] += 1
+            pos -= 1
+            nbs = neighbors[offsets[path[-1]]:offsets[path[-1] + 1]]
+            pivots = [where[nb] for nb in nbs if 0 <= where[nb] < len(path) - 2]
+        if not pivots:
+            break
+        if pos < last:
+            pivots = [i for i in pivots if deg[path[i + 1]]] or pivots
+        i = rng.choice(pivots)
+        path[i + 1:] = path[:i:-1]
+        for j in range(i + 1, len(path)):
+            where[path[j]] = j
+
+    if stats is not None:
+        stats['nodes'] = nodes
+        stats['exhausted'] = exhausted
+    if pos < last or home is not None and path[-1] not in home:
+        return False
+    for step, square in enumerate(path[1:], first):
+        board[square] = step
+    return True
+
+
+def stranded(masks, pos, free, home):
+    """
+    Tells whether the free squares can no longer all be fitted in a tour.
+
+    A square the walk has yet to pass through needs two ways in or out among
+    the free squares, the knight's square and `home`, the square a closed
+    tour returns to; only the last square of an open tour can make do with
+    one. So a square with none, more than one square with a single one, or
+    any with a single one on a closed tour means the search is stuck.
+
+    Args:
+        masks (tuple): Attack masks of the board, see `attacks`.
+        pos (int): Flat index of the knight's current square.
+        free (int): Bitboard of the unvisited squares.
+        home (int): Flat index of the start square of a closed tour, or None.
+
+    Returns:
+        bool: True if no tour can finish from here, False if one might.
+    """
+    if not free & (free - 1):  # The last square is settled by the move into it
+        return False
+    around = free | 1 << pos | (0 if home is None else 1 << home)
+    ends = 0 if home is None else 1
+    rest = free
+    while rest:
+        bit = rest & -rest
+        exits = (masks[bit.bit_length() - 1] & around).bit_count()
+        if exits < 2:
+            if exits == 0 or ends:
+                return True
+            ends = 1
+        rest ^= bit
+    return False
+
+
+def count_tours(n, m=None, start=None, closed=False, progress=None, piece=KNIGHT):
+    """
+    Counts every Knight's Tour of an n x m board by exhaustive search.
+
+    Tours are directed: a tour and its reverse count twice. The search runs
+    on bitboards (see `attacks`), cuts branches that strand a square (see
+    `stranded`), and memoizes the number of ways to finish from each
+    (square, unvisited set) pair, since many partial tours cover the same
+    squares and end on the same one. This is practical up to about 6 x 6.
+
+    A closed tour passes through every square, so closed tours are counted
+    from one square only; with `start` None the result is that count times
+    the number of squares, and the number of distinct cycles is the result
+    divided by twice the number of squares.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the tours start from, or None for all.
+        closed (bool): Whether to count closed tours only.
+        progress (function): Called as progress(done, total, count) after
+            each first move of the search has been explored.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+
+    Returns:
+        int: The number of tours.
+    """
+    if m is None:
+        m = n
+    if n * m == 1:
+        return int(not closed)
+    masks = attacks(n, m, piece)
+    full = (1 << n * m) - 1
+    memo = {}
+
+    def finish(pos, free, home):
+        """Number of ways to visit every square in `free` from `pos`."""
+        if not free:
+            return int(home is None or masks[pos] >> home & 1)
+        key = (pos, free)
+        if key not in memo:
+            total = 0
+            if not stranded(masks, pos, free, home):
+                near = masks[pos] & free
+                while near:
+                    bit = near & -near
+                    total += finish(bit.bit_length() - 1, free ^ bit, home)
+                    near ^= bit
+            memo[key] = total
+        return memo[key]
+
+    if start is not None:
+        starts = [start[0] * m + start[1]]
+    else:
+        starts = [0] if closed else range(n * m)
+    roots = [(sq, nb) for sq in starts for nb in adjacency(n, m, piece)[sq]]
+    count = 0
+    for done, (sq, nb) in enumerate(roots, 1):
+        count += finish(nb, full ^ (1 << sq | 1 << nb), sq if closed else None)
+        if progress is not None:
+            progress(done, len(roots), count)
+    if closed and start is None:
+        count *= n * m
+    return count
+
+
+def all_tours(n, m=None, start=None, closed=False, piece=KNIGHT):
+    """
+    Enumerates every Knight's Tour of an n x m board by exhaustive search.
+
+    The search of `count_tours` without the memo, since every tour has to be
+    walked to be produced.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board. Defaults to `n`.
+        start (tuple): (x, y) square the tours start from, or None for all.
+        closed (bool): Whether to enumerate closed tours only.
+        piece (tuple): The (dx, dy) moves of the piece, see `leaper`.
+
+    Yields:
+        array: The flat board (row by row) of each tour, filled with move
+        numbers.
+    """
+    if m is None:
+        m = n
+    masks = attacks(n, m, piece)
+    full = (1 << n * m) - 1
+    path = []
+
+    def extend(pos, free, home):
+        """Yields every completion of `path`, which ends on `pos`."""
+        if not free:
+            if home is None or masks[pos] >> home & 1:
+                yield path
+            return
+        if stranded(masks, pos, free, home):
+            return
+        near = masks[pos] & free
+        while near:
+            bit = near & -near
+            path.append(bit.bit_length() - 1)
+            yield from extend(path[-1], free ^ bit, home)
+            path.pop()
+            near ^= bit
+
+    starts = range(n * m) if start is None else [start[0] * m + start[1]]
+    for sq in starts:
+        path.append(sq)
+        for found in extend(sq, full ^ 1 << sq, sq if closed else None):
+            board = array('i', [0]) * (n * m)
+            for step, square in enumerate(found):
+                board[square] = step
+            yield board
+        path.pop()
+
+
+def chunks(n):
+    """
+    Splits a board side into the block sizes used by `kt_blocks`.
+
+    Sides are cut into odd lengths of at least 7, about 9 on average, so that
+    every block has odd area and its corner-to-edge paths exist. Sides too
+    short to be cut that way are kept whole.
+
+    Args:
+        n (int): Length of the board side.
+
+    Returns:
+        tuple: Block lengths adding up to `n`.
+    """
+    counts = [k for k in range(1, n // 7 + 1) if k % 2 == n % 2]
+    if not counts:
+        return (n,)
+    k = min(counts, key=lambda k: abs(k - n / 9))
+    size = n // k - (n // k + 1) % 2  # Largest odd length fitting k times
+    wider = (n - size * k) // 2
+    return (size + 2,) * wider + (size,) * (k - wider)
+
+
+# Block layout walked by `kt_blocks`: block heights, block widths, and
+# whether they tile the transposed board.
+Tiling = collections.namedtuple('Tiling', ['rows', 'cols', 'transposed'])
+
+
+def tiling(n, m, closed=False):
+    """
+    Cuts an n x m board into the blocks walked by `kt_blocks`.
+
+    A board with one even side too short to cut would need blocks of even
+    area, whose corner-to-edge paths mostly do not exist, so such a board is
+    cut as its transpose instead, with the short side across the bands.
+
+    A closed tour returns along the first column of blocks, which needs an
+    even number of bands and at least two blocks per band; the board is
+    transposed to get that. When neither way works, the board is walked as a
+    single band along its long side, of blocks carrying closed tours joined
+    to each other (see `band`), or of the strips of `ribbon` when the band is
+    3 high. Boards with both sides under 12, or 3 x 10 and 3 x 12, are kept
+    as a single block.
+
+    An open tour of a board 4 wide is never cut: the edge rows of a block 4
+    wide hold half its squares, of both colours, and no knight move joins two
+    of them, so every path through the block from an edge row ends on one,
+    out of reach of the next block. Such a board has to fit in a single block.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+        closed (bool): Whether the blocks are to carry a closed tour.
+
+    Returns:
+        Tiling: The block layout of the board.
+
+    Raises:
+        ValueError: If a board 4 wide is too long for a single block.
+    """
+    rows, cols = chunks(n), chunks(m)
+    if closed:
+        if len(rows) % 2 == 0 and len(cols) > 1:
+            return Tiling(rows, cols, False)
+        if len(cols) % 2 == 0 and len(rows) > 1:
+            return Tiling(cols, rows, True)
+        short, long = sorted((n, m))
+        if short == 3 and long >= 14:
+            _, cut = ribbon()
+            return Tiling((3,), (cut,) + (2,) * ((long - 14) // 2) + (14 - cut,), n > m)
+        if short > 3 and long >= 12:
+            return Tiling((short,), band(long, short % 2), n > m)
+        return Tiling((n,), (m,), False)
+    if 4 in (n, m) and len(rows) * len(cols) > 1:
+        raise ValueError(f"the block engine cannot cut a {n}x{m} board, a path through a "
+                         "block 4 wide ends on an edge row, out of reach of the next block")
+    if len(rows) == 1 and n % 2 == 0 and len(cols) > 1:
+        return Tiling(cols, rows, True)
+    return Tiling(rows, cols, False)
+
+
+def closable(n, m):
+    """
+    Tells whether an n x m board has a closed Knight's Tour.
+
+    By Schwenk's theorem it does unless both sides are odd, the shorter side
+    is 1, 2 or 4, or the board is 3 x 4, 3 x 6 or 3 x 8.
+
+    Args:
+        n (int): Number of rows of the board.
+        m (int): Number of columns of the board.
+
+    Returns:
+        bool: True if a closed tour exists, False otherwise.
+    """
+    short, long = sorted((n, m))
+    return (n * m) % 2 == 0 and short not in (1, 2, 4) and not (short == 3 and long in (4, 6, 8))
+
+
+def rotate(board, sq):
+    """
+    Renumbers a closed tour so that it starts on square `sq`.
+
+    A closed tour is a cycle, so starting it anywhere else just shifts every
+    move number; one closed tour per board serves all its start squares.
+
+    Args:
+        board (array): The flat move-order board of a closed tour.
+        sq (int): Flat index of the new start square.
+
+    Returns:
+        array: The renumbered board.
+    """
+    shift, total = board[sq], len(board)
+    return array('i', [(step - shift) % total for step in board])
+
+
+def route(rows, cols, closed):
+    """
+    Orders the blocks of a tiling the way `kt_blocks` walks them.
+
+    An open tour plows the bands like an ox, left to right and then right to
+    left, entering every block at a top corner. A closed tour starts from the
+    bottom-left corner of the first block, plows the bands through all but
+    the first column of blocks, and climbs that column back to the start.
+
+    Args:
+        rows (int): Number of bands of blocks.
+        cols (int): Number of blocks per band.
+        closed (bool): Whether to walk a closed tour.
+
+    Yields:
+        tuple: (band, block, corner) of each block in walking order, the entry
+        corner given as (bottom, right) flags.
+    """
+    if not closed:
+        for i in range(rows):
+            for j in (range(cols) if i % 2 == 0 else range(cols - 1, -1, -1)):
+                yield i, j, (0, i % 2)
+        return
+    yield 0, 0, (1, 0)
+    for i in range(rows):
+        for j in (range(1, cols) if i % 2 == 0 else range(cols - 1, 0, -1)):
+            yield i, j, (0, i % 2)
+    for i in range(rows - 1, 0, -1):
+        yield i, 0, (1, 1)
+
+
+@functools.lru_cache(maxsize=None)
+def block_path(h, w, ends):
+    """
+    Finds the path of the knight through one h x w block of `kt_blocks`.
+
+    The path starts in the top-left corner of the block and covers it, ending
+    on one of the `ends` squares so it can hop into the next block. It is
+    found with short `kt_backtrack` searches under a seeded random tie-break,
+    restarted until one succeeds, and cached, so a whole board only ever
+    runs a handful of small searches and always gets the same tour.
+
+    Args:
+        h (int): Number of rows of the block.
+        w (int): Number of columns of the block.
+        ends (frozenset): Flat indices (within the block) the path may end
+            on, or None for any square.
+
+    Returns:
+        tuple: Flat indices (row by row within the block) in visiting order,
+        or None if no path was found.
+    """
+    adj = adjacency(h, w)
+    rank = randomized(f'{h}x{w} {sorted(ends or ())}')(h, w, adj)
+    for _ in range(1000):
+        board = array('i', [-1]) * (h * w)
+        board[0] = 0
+        if kt_backtrack(board, adj, 0, 1, rank, max_nodes=10 * h * w, ends=ends):
+            path = [0] * (h * w)
+            for sq, step in enumerate(board):
+                path[step] = sq
+            return tuple(path)
+    return None
+
+
+def band(n, even=False):
+    """
+    Splits the long side of a thin board into the blocks of a closed tour.
+
+    A closed tour of `kt_blocks` on a board with a side too short to cut is
+    walked along a single band of blocks about 9 wide, and at least 6, so
+    that their tours can be joined (see `seam`). Blocks of odd height have no
+    closed tour unless their width is even.
+
+    Args:
+        n (int): Length of the board side, at least 12.
+        even (bool): Whether the block widths must be even.
+
+    Returns:
+        tuple: Block widths adding up to `n`.
+    """
+    k = max(2, round(n / 9))
+    unit = 2 if even else 1
+    size, wider = divmod(n // unit, k)
+    return (unit * (size + 1),) * wider + (unit * size,) * (k - wider)
+
+
+@functools.lru_cache(maxsize=None)
+def seam(h, left, right):
+    """
+    Finds how `kt_blocks` joins the closed tours of two neighbouring blocks.
+
+    The blocks are h x left and h x right, side by side, each carrying the
+    closed tour of `block_path` that ends next to its top-left corner. Two
+    moves near the cut, a-b of the left tour and c-d of the right one, are
+    swapped for the moves a-c and b-d across it, which makes a single closed
+    tour of both blocks.
+
+    Args:
+        h (int): Number of rows of the blocks.
+        left (int): Number of columns of the left block.
+        right (int): Number of columns of the right block.
+
+    Returns:
+        tuple: Flat indices ((a, b), (c, d)), each within its own block, or
+        None if the tours cannot be joined.
+    """
+    tours = [block_path(h, w, frozenset(adjacency(h, w)[0])) for w in (left, right)]
+    if None in tours:
+        return None
+    left_tour, right_tour = tours
+    for a, b in zip(left_tour, left_tour[1:] + left_tour[:1]):
+        if min(a % left, b % left) < left - 2:
+            continue
+        for c, d in zip(right_tour, right_tour[1:] + right_tour[:1]):
+            if max(c % right, d % right) > 1:
+                continue
+            for c, d in ((c, d), (d, c)):
+                if all({abs(x // left - y // right), abs(x % left - left - y % right)} == {1, 2}
+                       for x, y in ((a, c), (b, d))):
+                    return (a, b), (c, d)
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def ribbon():
+    """
+    Finds the closed tour of a 3 x 16 board that `kt_blocks` stretches.
+
+    Blocks of 3 rows have too few closed tours to be joined like the blocks
+    of `seam`. Instead, the tour is the first one of `all_tours` with two
+    cuts 2 columns apart that the same moves cross, joined in pairs by the
+    same paths on the left of each cut. The strip between the cuts can then
+    be repeated any number of times, or dropped, and the tour stays closed,
+    giving closed tours of every 3 x n board with an even n of 14 or more.
+
+    Returns:
+        tuple: The tour as flat indices in visiting order, and the column of
+        its first cut.
+    """
+    for board in all_tours(3, 16, (0, 0), closed=True):
+        path = [0] * len(board)
+        for sq, step in enumerate(board):
+            path[step] = sq
+        moves = list(zip(path, path[1:] + path[:1]))
+
+        def joins(cut):
+            """The moves across `cut`, in pairs joined on its left."""
+            across = [(a, b) for a, b in moves if min(a % 16, b % 16) < cut <= max(a % 16, b % 16)]
+            ends = [frozenset((a // 16, a % 16 - cut, b // 16, b % 16 - cut)
+                              for a, b in (move, move[::-1])) for move in across]
+            return {frozenset((ends[i - 1], ends[i]))
+                    for i, (a, _) in enumerate(across) if a % 16 < cut}
+
+        for cut in range(2, 13):
+            if joins(cut) == joins(cut + 2):
+                return tuple(path), cut
+    return None
+
+
+@functools.lru_cache(maxsize=None)
+def band_arcs(h, w, left, right):
+    """
+    Cuts a closed tour of a band of `kt_blocks` into its runs in one block.
+
+    A band tour of height 3 is the tour of `ribbon`, with the strip repeated;
+    otherwise every block carries a closed tour of its own, joined to those of
+    its neighbours (see `seam`). Either way, each square of the block is
+    linked to two others, in this block or a neighbouring one, and the tour
+    passes through the block in a few runs between links out of it.
+
+    Args:
+        h (int): Number of rows of the block.
+        w (int): Number of columns of the block.
+        left (int): Number of columns of the previous block, or None.
+        right (int): Number of columns of the next block, or None.
+
+    Returns:
+        dict: Maps each way into the block, as the square entered and the
+        (step, square) link it is entered from, step -1 from the previous
+        block and 1 from the next, to the run of squares walked from there
+        and the way out, as the square left and the (step, square) link it
+        leaves through. Squares are flat indices within their own block.
+        None if the tour cannot be built.
+    """
+    links = [[] for _ in range(h * w)]
+    if h == 3:
+        path, cut = ribbon()
+        lo = 0 if left is None else cut if right is not None else cut + 2
+        hi = 16 if right is None else cut if left is None else cut + 2
+        for a, b in zip(path, path[1:] + path[:1]):
+            for a, b in ((a, b), (b, a)):
+                ya, yb = a % 16, b % 16
+                if not lo <= ya < hi:
+                    continue
+                if yb < lo:
+                    link = (-1, b // 16 * left + yb - lo + left)
+                elif yb >= hi:
+                    link = (1, b // 16 * right + yb - hi)
+                else:
+                    link = (0, b // 16 * w + yb - lo)
+                links[a // 16 * w + ya - lo].append(link)
+    else:
+        path = block_path(h, w, frozenset(adjacency(h, w)[0]))
+        if path is None or left and not seam(h, left, w) or right and not seam(h, w, right):
+            return None
+        for a, b in zip(path, path[1:] + path[:1]):
+            links[a].append((0, b))
+            links[b].append((0, a))
+        if left:  # Swap a move for the two across each cut
+            (a, b), (c, d) = seam(h, left, w)
+            links[c][links[c].index((0, d))] = (-1, a)
+            links[d][links[d].index((0, c))] = (-1, b)
+        if right:
+            (a, b), (c, d) = seam(h, w, right)
+            links[a][links[a].index((0, b))] = (1, c)
+            links[b][links[b].index((0, a))] = (1, d)
+
+    arcs = {}
+    for sq, pair in enumerate(links):
+        for into in pair:
+            if not into[0]:
+                continue
+            run, prev, cur = [], into, sq
+            while True:
+                run.append(cur)
+                first, second = links[cur]
+                out = first if second == prev else second
+                if out[0]:
+                    break
+                prev, cur = (0, cur), out[1]
+            arcs[sq, into] = run, cur, out
+    return arcs
+
+
+def stitch(tiles, closed=False):
+    """
+    Lays out the block paths of a `kt_blocks` tour, one block at a time.
+
+    Blocks are produced in walking order (see `route`) and nothing is kept
+    per block, so a whole tour can be streamed in memory proportional to the
+    board side rather than its area.
+
+    Args:
+        tiles (Tiling): Block layout of the board, see `tiling`.
+        closed (bool): Whether the tour must end a knight move from its start.
+
+    Yields:
+        tuple: The flat index of the block's top-left square on the board and
+        the offsets from there of the squares of its path, in visiting order.
+        A closed tour of a single band passes through its blocks in several
+        runs (see `band_arcs`), each yielded the same way. Stops early if some
+        block has no path.
+    """
+    rows, cols, transposed = tiles
+    m = sum(rows) if transposed else sum(cols)
+    stride_x, stride_y = (1, m) if transposed else (m, 1)
+    row_starts = list(itertools.accumulate(rows, initial=0))
+    col_starts = list(itertools.accumulate(cols, initial=0))
+
+    if closed and len(rows) == 1 and len(cols) > 1:  # Follow the links between blocks
+        sides = list(zip(cols, (None,) + cols[:-1], cols[1:] + (None,)))
+        runs = {}
+        j, way = 0, None
+        while True:
+            w = sides[j][0]
+            arcs = band_arcs(rows[0], *sides[j])
+            if arcs is None:
+                return
+            if way is None:
+                way = first = next(iter(arcs))
+            run, out, (step, target) = arcs[way]
+            if (sides[j], way) not in runs:
+                runs[sides[j], way] = [p // w * stride_x + p % w * stride_y for p in run]
+            yield col_starts[j] * stride_y, runs[sides[j], way]
+            j, way = j + step, (target, (-step, out))
+            if j == 0 and way == first:
+                return
+
+    def corner(i, j, flags):
+        """Tiling coordinates of a corner of block (i, j)."""
+        bottom, right = flags
+        return (row_starts[i] + bottom * (rows[i] - 1), col_starts[j] + right * (cols[j] - 1))
+
+    order = route(len(rows), len(cols), closed)
+    first = next(order)
+    paths = {}
+
+    for block, target in itertools.pairwise(itertools.chain(
+            [first], order, [first if closed else None])):
+        i, j, (bottom, right) = block
+        h, w = rows[i], cols[j]
+        r0, c0 = row_starts[i], col_starts[j]
+        ends = None
+        if target is not None:  # Squares of this block a knight move away from the next entry
+            tx, ty = corner(*target)
+            ends = frozenset(
+                (h - 1 - lx if bottom else lx) * w + (w - 1 - ly if right else ly)
+                for lx, ly in ((tx + dx - r0, ty + dy - c0) for dx, dy in zip(MX, MY))
+                if 0 <= lx < h and 0 <= ly < w
+            )
+
+        key = (h, w, ends, bottom, right)
+        if key not in paths:
+            path = block_path(h, w, ends)
+            if path is None:
+                return
+            paths[key] = [
+                (h - 1 - p // w if bottom else p // w) * stride_x
+                + (w - 1 - p % w if right else p % w) * stride_y
+                for p in path
+            ]
+        yield r0 * stride_x + c0 * stride_y, paths[key]
+
+
+def kt_blocks(board, tiles, sq, pos, closed=False):
+    """
+    Builds a Knight's Tour by stitching together paths through small blocks.
+
+    The board is cut into blocks of about 9 x 9 (see `tiling`) that the knight
+    walks one after the other (see `route`). Each block is entered at a
+    corner and covered by a path ending one knight move away from the entry
+    corner of the next block (see `block_path`). Paths are searched with the
+    entry corner flipped to the top-left, and there are only a few distinct
+    block shapes and exits, so they are searched once, cached, and flipped
+    back into place. Everything else is writing move numbers, so the time is
+    linear in the size of the board, and each block could be written
+    independently of the others. Boards with a side too short to cut (under
+    14) are walked in a single band of blocks, or as a single block; boards 4
+    wide only as a single block (see `tiling`).
+
+    An open tour starts from a corner of the board; other corners are reached
+    by mirroring the one from (0, 0). A closed tour ends next to where it
+    started, so it is built once and renumbered to start on any square. On
+    a board walked in a single band, its blocks carry closed tours instead,
+    joined across the cuts (see `band_arcs`).
+
+    Args:
+        board (array): The flat move-order board, row by row.
+        tiles (Tiling): Block layout of the board, see `tiling`.
+        sq (int): Flat index of the knight's current square.
+        pos (int): The number of the current move (starting from 1).
+        closed (bool): Whether the tour must end a knight move from its start.
+
+    Returns:
+        bool: True if the knight successfully completes the tour, False otherwise.
+    """
+    n, m = sum(tiles.rows), sum(tiles.cols)
+    if tiles.transposed:
+        n, m = m, n
+    flip_x, flip_y = sq // m, sq % m
+    if closed:
+        tiles = tiling(n, m, closed=True)
+        flip_x = flip_y = 0
+    elif flip_x not in (0, n - 1) or flip_y not in (0, m - 1):
+        raise ValueError("the block engine starts an open tour from a corner of the board")
+
+    step = 0
+    for base, path in stitch(tiles, closed):
+        for offset in path:
+            board[base + offset] = step
+            step += 1
+    if step < len(board):  # Some block has no path, undo the partial tour
+        for k, cell in enumerate(board):
+            if cell >= pos:
+                board[k] = -1
+        return False
+
+    if flip_y:
+        for x in range(n):
+            board[x * m:(x + 1) * m] = board[x * m:(x + 1) * m][::-1]
+    if flip_x:
+        for x in range(n // 2):
+            top, bottom = board[x * m:(x + 1) * m], board[(n - 1 - x) * m:(n - x) * m]
+            board[x * m:(x + 1) * m], board[(n - 1 - x) * m:(n - x) * m] = bottom, top
+    if closed:
+        board[:] = rotate(board, sq)
+    if pos > 1:
+        for k, cell in enumerate(board):
+            board[k] = cell + pos - 1
+    return True
+
+
+# Tour engines selectable through `solve(engine=...)`.
+ENGINES = {
+    'recursive': kt,
+    'iterative': kt_iterative,
+    'incremental': kt_incremental,
+    'compact': kt_compact,
+    'numpy': kt_numpy,
+    'backtrack': kt_backtrack,
+    'bitboard': kt_bitboard,
+    'posa': kt_posa,
+    'blocks': kt_blocks,
+}
+
+# Keyword options each engine accepts on top of (board, adj, sq, pos).
+ENGINE_OPTIONS = {
+    'incremental': {'tiebreak'},
+    'backtrack': {'tiebreak', 'max_nodes', 'timeout', 'stats', 'ends', 'closed'},
+    'bitboard': {'max_nodes', 'timeout', 'stats'},
+    'posa': {'max_nodes', 'timeout', 'stats', 'closed'},
+    'blocks': {'closed'},
+}
+
+# Move structure each engine walks on, when it is not an adjacency table.
+LAYOUTS = {
+    'compact': padding,
+    'numpy': padding,
+    'bitboard': attacks,
+    'posa': csr,
+    'blocks': tiling,
+}
+
+
+def write_text(board, m, stream):
+    """
+    Writes the board as an aligned grid of move numbers.
+
+    Every cell is padded to the width of the longest move number, so boards
+    of any size line up. Rows are formatted many at a time with a single
+    %-format, and written out in large chunks.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary or text stream to write to.
+    """
+    width = max(len(str(max(board))), len(str(min(board))))
+    write_rows(board, m, stream, ' '.join([f'%{width}d'] * m) + '\n')
+
+
+def write_csv(board, m, stream):
+    """
+    Writes the board as CSV, one row of move numbers per line.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary stream to write to.
+    """
+    write_rows(board, m, stream, ','.join(['%d'] * m) + '\n')
+
+
+def write_json(board, m, stream):
+    """
+    Writes the board as a JSON array of rows of move numbers.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary stream to write to.
+    """
+    stream.write(b'[')
+    write_rows(board, m, stream, '[' + ','.join(['%d'] * m) + '],\n', last=']\n')
+
+
+def write_rows(board, m, stream, row, last=None):
+    """
+    Writes the board row by row with a %-format, `CHUNK` squares at a time.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary or text stream to write to.
+        row (str): %-format of one row, with one field per column.
+        last (str): Replaces the last two characters of the output, to close
+            a delimited format.
+    """
+    rows = max(1, CHUNK // m)
+    step = rows * m
+    chunk = row * rows
+    text_stream = isinstance(stream, io.TextIOBase)
+    for i in range(0, len(board), step):
+        cells = board[i:i + step]
+        text = (chunk if len(cells) == step else row * (len(cells) // m)) % tuple(cells)
+        if last is not None and i + step >= len(board):
+            text = text[:-2] + last
+        stream.write(text if text_stream else text.encode('ascii'))
+
+
+def write_npy(board, m, stream):
+    """
+    Writes the board as a NumPy .npy file of shape (n, m).
+
+    The header is written by hand, so NumPy is not needed to produce the
+    file, only to read it. Moves are stored in the narrowest unsigned type
+    that holds them (see `pack`), or as int32 if the board holds negative
+    cells such as `BLOCKED`.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary stream to write to.
+    """
+    typecode = 'B' if len(board) <= 2 ** 8 else 'H' if len(board) <= 2 ** 16 else 'i'
+    if min(board) < 0:  # Blocked squares or an unfinished tour
+        typecode = 'i'
+    descr = {'B': '|u1', 'H': '<u2', 'i': '<i4'}[typecode]
+    header = f"{{'descr': '{descr}', 'fortran_order': False, 'shape': ({len(board) // m}, {m}), }}"
+    header += ' ' * (-(len(header) + 11) % 64) + '\n'  # Align the data to 64 bytes
+    stream.write(b'\x93NUMPY\x01\x00' + struct.pack('<H', len(header)) + header.encode('latin1'))
+    write_array(board, typecode, stream)
+
+
+def write_raw(board, m, stream):
+    """
+    Writes the tour as a raw move list: the flat index of the square of
+    every move in order, as little-endian 32-bit unsigned integers. Blocked
+    squares are left out.
+
+    Args:
+        board (array): The flat board of a complete tour, row by row.
+        m (int): Number of columns of the board.
+        stream: Binary stream to write to.
+    """
+    squares = array('I', [0]) * (len(board) - board.count(BLOCKED))
+    for sq, step in enumerate(board):
+        if step != BLOCKED:
+            squares[step] = sq
+    write_array(squares, 'I', stream)
+
+
+def write_array(values, typecode, stream):
+    """
+    Writes integers as little-endian binary, `CHUNK` values at a time.
+
+    Args:
+        values (sequence): The integers to write.
+        typecode (str): The array typecode to write them as.
+        stream: Binary stream to write to.
+    """
+    for i in range(0, len(values), CHUNK):
+        chunk = array(typecode, values[i:i + CHUNK])
+        if sys.byteorder == 'big':
+            chunk.byteswap()
+        stream.write(chunk.tobytes())
+
+
+# Squares formatted or converted per write by the board writers.
+CHUNK = 1 << 16
+
+# Board writers selectable through `save(format=...)`, by name and by file
+# extension.
+WRITERS = {
+    'text': write_text,
+    'txt': write_text,
+    'csv': write_csv,
+    'json': write_json,
+    'npy': write_npy,
+    'raw': write_raw,
+    'bin': write_raw,
+}
+
+
+def save(board, m, path, format=None):
+    """
+    Writes a board to a file through a large buffer.
+
+    Args:
+        board (array): The flat board, row by row.
+        m (int): Number of columns of the board.
+        path (str): Path of the file to write.
+        format (str): Key of `WRITERS`. Defaults to the file extension.
+    """
+    if format is None:
+        format = os.path.splitext(path)[1].lstrip('.').lower()
+    if format not in WRITERS:
+        raise ValueError(f"unknown format {format!r}, expected one of {sorted(WRITERS)}")
+    with open(path, 'wb', buffering=1 << 20) as stream:
+        WRITERS[format](board, m, stream)
+
+
+# Shape of a board loaded by `load_mask`: its size and the (x, y) squares
+# cut out of it, ready for `tour(n, m, blocked=...)`.
+Mask = collections.namedtuple('Mask', ['n', 'm', 'blocked'])
+
+
+def load_mask(path):
+    """
+    Loads the shape of a board from a text or PBM bitmap file.
+
+    In a text file every line is a row of the board, `.` being a square and
+    any other character, such as `#`, a square cut out of it; rows shorter
+    than the longest one are cut short on the right. A PBM file (plain P1 or
+    raw P4, as exported by most image editors) has one pixel per square,
+    black pixels being the squares cut out.
+
+    Args:
+        path (str): Path of the mask file.
+
+    Returns:
+        Mask: The size of the board and its blocked squares.
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    if data[:2] in (b'P1', b'P4'):
+        fields = []
+        offset = 2
+        while len(fields) < 2:  # Width and height, between whitespace and comments
+            while data[offset:offset + 1].isspace() or data[offset:offset + 1] == b'#':
+                if data[offset:offset + 1] == b'#':
+                    offset = data.index(b'\n', offset)
+                offset += 1
+            end = offset
+            while data[end:end + 1].isdigit():
+                end += 1
+            fields.append(int(data[offset:end]))
+            offset = end
+        m, n = fields
+        if data[:2] == b'P1':
+            bits = [c - 48 for c in re.sub(rb'#[^\n]*', b'', data[offset:]) if c in b'01']
+        else:
+            stride = (m + 7) // 8
+            pixels = data[offset + 1:offset + 1 + n * stride]
+            bits = [pixels[x * stride + y // 8] >> (7 - y % 8) & 1 for x in range(n) for y in range(m)]
+        if len(bits) < n * m:
+            raise ValueError(f"{path} holds {len(bits)} pixels, expected {n * m}")
+        blocked = frozenset(divmod(i, m) for i in range(n * m) if bits[i])
+        return Mask(n, m, blocked)
+
+    rows = data.decode('ascii').rstrip().splitlines()
+    n, m = len(rows), max(map(len, rows), default=0)
+    blocked = frozenset((x, y) for x, row in enumerate(rows) for y in range(m) if row[y:y + 1] != '.')
+    return Mask(n, m, blocked)
 
 
-def display(board):
+def display(board, m):
     """
     Prints the current state of the board, showing the knight's tour.
 
-    The board is displayed with the move numbers in a nicely formatted grid.
+    The board is displayed with the move numbers in a nicely formatted grid
+    (see `write_text`).
 
     Args:
-        board (list): The current board configuration showing move numbers.
+        board (list): The flat board configuration showing move numbers.
+        m (int): Number of columns of the board.
     """
-    for row in board:
-        print(' '.join(f'{cell:2}' for cell in row))
+    # Text-only stdout, as under redirect_stdout or in a notebook, is written as is
+    stream = getattr(sys.stdout, 'buffer', sys.stdout)
+    sys.stdout.flush()
+    write_text(board, m, stream)
+    stream.flush()
 
 
 if __name__ == "__main__":
@@ -0,0 +1,75 @@
+import tempfile
+import unittest
+
+import main
+
+
+class DiskTourCacheTest(unittest.TestCase):
+
+    def test_round_trip(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = main.DiskTourCache(directory)
+            board = main.tour(8, 8, (2, 3), cache=cache)
+            self.assertIsNotNone(board)
+            self.assertEqual(cache.misses, 1)
+            self.assertEqual(main.tour(8, 8, (2, 3), cache=cache), board)
+            self.assertEqual(cache.hits, 1)
+
+    def test_round_trip_closed(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = main.DiskTourCache(directory)
+            board = main.tour(6, 6, (1, 2), closed=True, cache=cache)
+            self.assertIsNotNone(board)
+            self.assertEqual(main.tour(6, 6, (1, 2), closed=True, cache=cache), board)
+            self.assertEqual(cache.hits, 1)
+
+    def test_lookup(self):
+        with tempfile.TemporaryDirectory() as directory:
+            cache = main.DiskTourCache(directory)
+            for n, m, start, closed in ((8, 6, (5, 4), False), (6, 8, (1, 7), True)):
+                board = main.tour(n, m, start, closed=closed, cache=cache)
+                with cache.lookup(n, m, start, closed) as view:
+                    steps = [view.step(x, y) for x in range(n) for y in range(m)]
+                self.assertEqual(steps, list(board))
+            self.assertIsNone(cache.lookup(8, 8, (3, 3)))
+
+
+class CountToursTest(unittest.TestCase):
+
+    def test_known_counts(self):
+        self.assertEqual(main.count_tours(5), 1728)
+        self.assertEqual(main.count_tours(3, 4), 16)
+        self.assertEqual(main.count_tours(5, 6, closed=True) // 60, 8)
+
+    def test_all_tours_agrees(self):
+        self.assertEqual(sum(1 for _ in main.all_tours(3, 4)), main.count_tours(3, 4))
+
+
+class BlocksTest(unittest.TestCase):
+
+    def assertTour(self, board, n, m, closed=False):
+        self.assertIsNotNone(board)
+        squares = sorted(range(n * m), key=board.__getitem__)
+        self.assertEqual([board[sq] for sq in squares], list(range(n * m)))
+        if closed:
+            squares.append(squares[0])
+        for a, b in zip(squares, squares[1:]):
+            dx, dy = abs(a // m - b // m), abs(a % m - b % m)
+            self.assertEqual({dx, dy}, {1, 2})
+
+    def test_thin_open(self):
+        for n, m in ((3, 7), (3, 20), (31, 3), (4, 5), (4, 13), (15, 4)):
+            self.assertTour(main.tour(n, m, engine='blocks', cache=None), n, m)
+
+    def test_thin_closed(self):
+        for n, m in ((3, 14), (3, 40), (42, 3), (5, 140), (7, 122), (8, 149), (14, 15)):
+            self.assertTour(main.tour(n, m, closed=True, cache=None), n, m, closed=True)
+
+    def test_long_four_wide(self):
+        for n, m in ((4, 14), (40, 4)):
+            with self.assertRaises(ValueError):
+                main.tour(n, m, engine='blocks', cache=None)
+
+
+if __name__ == "__main__":
+    unittest.main()